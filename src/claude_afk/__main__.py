@@ -1,3 +1,54 @@
-from claude_afk.cli import main
+"""Entry point for the ``claude-afk`` script and ``python -m claude_afk``.
 
-main()
+Claude Code spawns ``claude-afk hook <name>`` for every hook event, so
+those invocations are dispatched straight to the handler module without
+importing Click.  Everything else (and any hook call with arguments the
+fast path doesn't understand, e.g. ``--help``) goes through the Click CLI
+in :mod:`claude_afk.cli`.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+
+_HOOKS = frozenset({"stop", "pretooluse", "planapproval", "notify"})
+_NOTIFY_EVENTS = frozenset({"stop", "notification"})
+
+
+def _parse_hook_kwargs(name: str, args: list[str]) -> dict | None:
+    """Parse hook arguments, or return None to defer to Click."""
+    if not args:
+        return {}
+    if name != "notify":
+        return None
+    if len(args) == 2 and args[0] == "--event":
+        event = args[1]
+    elif len(args) == 1 and args[0].startswith("--event="):
+        event = args[0].partition("=")[2]
+    else:
+        return None
+    return {"event": event} if event in _NOTIFY_EVENTS else None
+
+
+def _dispatch_hook(argv: list[str]) -> bool:
+    """Run ``hook <name>`` directly. Returns False if Click should handle argv."""
+    if len(argv) < 2 or argv[0] != "hook" or argv[1] not in _HOOKS:
+        return False
+    kwargs = _parse_hook_kwargs(argv[1], argv[2:])
+    if kwargs is None:
+        return False
+    importlib.import_module(f"claude_afk.hooks.{argv[1]}").main(**kwargs)
+    return True
+
+
+def main() -> None:
+    if _dispatch_hook(sys.argv[1:]):
+        return
+    from claude_afk.cli import main as cli_main
+
+    cli_main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""JSON encode/decode helpers.
+
+Uses ``orjson`` when it is installed (``pip install claude-afk[fast]``) and
+falls back to the stdlib ``json`` module otherwise.  Both paths work on
+UTF-8 ``bytes`` so callers can read and write files in binary mode.
+
+``orjson.JSONDecodeError`` subclasses ``json.JSONDecodeError``, so callers
+only need to catch the stdlib exception.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import IO, Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised via monkeypatch in tests
+    orjson = None
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse a JSON document from *data*."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Serialize *obj* to UTF-8 JSON bytes.
+
+    With *indent*, output is pretty-printed with two-space indentation and
+    a trailing newline (the on-disk format for config and state files).
+    """
+    if orjson is not None:
+        if indent:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+        return orjson.dumps(obj)
+    if indent:
+        return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def dump(obj: Any, fp: IO[bytes], *, indent: bool = False) -> None:
+    """Serialize *obj* into the binary file *fp*.
+
+    The stdlib fallback streams encoder chunks into *fp* instead of building
+    the whole document as one ``str`` first; pair it with a buffered file.
+    """
+    if orjson is not None:
+        fp.write(dumps(obj, indent=indent))
+        return
+    if indent:
+        encoder = json.JSONEncoder(indent=2, ensure_ascii=False)
+    else:
+        encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+    for chunk in encoder.iterencode(obj):
+        fp.write(chunk.encode())
+    if indent:
+        fp.write(b"\n")
@@ -3,20 +3,26 @@
 from __future__ import annotations
 
 import contextlib
+import copy
+import functools
 import json
 import random
+import re
 import shutil
 import sys
+from dataclasses import replace
 from pathlib import Path
 
 import click
 
-from claude_afk import __version__
+from claude_afk import __version__, _json
 from claude_afk.config import (
     AFK_HOME,
     SlackConfig,
+    all_sessions_enabled,
+    append_state_op,
+    atomic_writer,
     load_state,
-    save_state,
     session_exists,
 )
 
@@ -70,9 +76,12 @@ def notify(event: str) -> None:
     notify_main(event=event)
 
 
-_HOOK_MARKER = "claude-afk"
+# Hook commands written by any claude-afk install, whatever its path prefix:
+# ``/path/to/claude-afk hook <name>`` or ``<python> -m claude_afk hook <name>``.
+_HOOK_COMMAND_RE = re.compile(r"(?:claude-afk|-m claude_afk) hook ")
 
 
+@functools.lru_cache(maxsize=1)
 def _resolve_command_prefix() -> str:
     """Resolve the command prefix for hook entries.
 
@@ -86,7 +95,12 @@ def _resolve_command_prefix() -> str:
     return f"{sys.executable} -m claude_afk"
 
 
+@functools.lru_cache(maxsize=1)
 def _build_hooks_to_install() -> dict:
+    """Return the hook entries claude-afk installs, keyed by event name.
+
+    Built once per process; callers must treat the result as read-only.
+    """
     prefix = _resolve_command_prefix()
     return {
         "PreToolUse": [
@@ -126,14 +140,65 @@ def _build_hooks_to_install() -> dict:
     }
 
 
+@functools.lru_cache(maxsize=16)
+def _settings_path(claude_home: str) -> Path:
+    """Return the settings.json path for a Claude home (``~`` expanded)."""
+    return Path(claude_home).expanduser() / "settings.json"
+
+
+@functools.lru_cache(maxsize=1)
+def _command_prefixes() -> tuple[str, ...]:
+    """``"<prefix> hook "`` for every hook command this install writes."""
+    return tuple(
+        {
+            h["command"].rsplit(" hook ", 1)[0] + " hook "
+            for entries in _build_hooks_to_install().values()
+            for e in entries
+            for h in e["hooks"]
+        }
+    )
+
+
+def _is_afk_entry(entry: dict) -> bool:
+    """Return True if a settings.json hook entry was installed by claude-afk.
+
+    Our own commands match the prefix tuple; the regex still catches entries
+    written by an install with a different command prefix.
+    """
+    prefixes = _command_prefixes()
+    for h in entry.get("hooks", ()):
+        command = h.get("command", "")
+        if command.startswith(prefixes) or _HOOK_COMMAND_RE.search(command):
+            return True
+    return False
+
+
+def _is_pretty(raw: bytes) -> bool:
+    """Return True if a JSON document spans multiple lines (hand-formatted)."""
+    return b"\n" in raw.strip()
+
+
+def _write_settings(settings_path: Path, settings: dict, *, indent: bool = False) -> None:
+    """Stream *settings* to disk through a 64 KiB buffered writer.
+
+    Written compact unless *indent* is set, which callers use to keep an
+    existing pretty-printed settings.json readable.
+    """
+    with atomic_writer(settings_path, buffering=65536) as f:
+        _json.dump(settings, f, indent=indent)
+
+
 def _install_hooks(claude_home: str) -> bool:
     """Merge claude-afk hooks into a Claude Code settings.json."""
-    settings_path = Path(claude_home).expanduser() / "settings.json"
+    settings_path = _settings_path(claude_home)
+    indent = False
 
     if settings_path.exists():
         try:
-            with open(settings_path) as f:
-                settings = json.load(f)
+            with open(settings_path, "rb") as f:
+                raw = f.read()
+            settings = _json.loads(raw)
+            indent = _is_pretty(raw)
         except (json.JSONDecodeError, OSError):
             settings = {}
     else:
@@ -146,32 +211,28 @@ def _install_hooks(claude_home: str) -> bool:
         existing = hooks.get(event_name, [])
 
         # Remove any previous claude-afk entries to avoid duplicates
-        existing = [
-            e
-            for e in existing
-            if not any(_HOOK_MARKER in h.get("command", "") for h in e.get("hooks", []))
-        ]
+        existing = [e for e in existing if not _is_afk_entry(e)]
 
-        existing.extend(entries)
+        # The builder is cached; copy so the settings tree never aliases it
+        existing.extend(copy.deepcopy(entries))
         hooks[event_name] = existing
 
-    with open(settings_path, "w") as f:
-        json.dump(settings, f, indent=2)
-        f.write("\n")
+    _write_settings(settings_path, settings, indent=indent)
 
     return True
 
 
 def _uninstall_hooks(claude_home: str) -> bool:
     """Remove claude-afk hooks from a Claude Code settings.json."""
-    settings_path = Path(claude_home).expanduser() / "settings.json"
+    settings_path = _settings_path(claude_home)
 
     if not settings_path.exists():
         return False
 
     try:
-        with open(settings_path) as f:
-            settings = json.load(f)
+        with open(settings_path, "rb") as f:
+            raw = f.read()
+        settings = _json.loads(raw)
     except (json.JSONDecodeError, OSError):
         return False
 
@@ -180,11 +241,7 @@ def _uninstall_hooks(claude_home: str) -> bool:
 
     for event_name in list(hooks.keys()):
         original = hooks[event_name]
-        filtered = [
-            e
-            for e in original
-            if not any(_HOOK_MARKER in h.get("command", "") for h in e.get("hooks", []))
-        ]
+        filtered = [e for e in original if not _is_afk_entry(e)]
         if len(filtered) != len(original):
             changed = True
             if filtered:
@@ -193,9 +250,7 @@ def _uninstall_hooks(claude_home: str) -> bool:
                 del hooks[event_name]
 
     if changed:
-        with open(settings_path, "w") as f:
-            json.dump(settings, f, indent=2)
-            f.write("\n")
+        _write_settings(settings_path, settings, indent=_is_pretty(raw))
 
     return changed
 
@@ -208,7 +263,7 @@ def _uninstall_hooks(claude_home: str) -> bool:
 )
 def setup(claude_home: str) -> None:
     """Set up claude-afk — configure Slack tokens and install hooks."""
-    from slack_sdk import WebClient
+    from claude_afk.slack.client import get_web_client
 
     click.echo("claude-afk setup\n")
 
@@ -241,7 +296,7 @@ def setup(claude_home: str) -> None:
     )
 
     click.echo("\nOpening DM conversation...")
-    client = WebClient(token=bot_token)
+    client = get_web_client(bot_token)
 
     try:
         dm_resp = client.conversations_open(users=user_id)
@@ -285,7 +340,8 @@ def setup(claude_home: str) -> None:
     if expanded_home not in claude_homes:
         claude_homes.append(expanded_home)
 
-    config = SlackConfig(
+    config = replace(
+        existing,
         bot_token=bot_token,
         socket_mode_token=socket_token,
         user_id=user_id,
@@ -297,7 +353,7 @@ def setup(claude_home: str) -> None:
     click.echo(f"Config saved to {AFK_HOME / 'config.json'}")
 
     _install_hooks(claude_home)
-    click.echo(f"Hooks installed in {Path(claude_home).expanduser() / 'settings.json'}")
+    click.echo(f"Hooks installed in {_settings_path(claude_home)}")
 
     with contextlib.suppress(Exception):
         client.chat_postMessage(
@@ -320,7 +376,7 @@ def _require_setup() -> SlackConfig:
         click.echo(
             f"Not configured. Run `claude-afk setup` first.\n\nConfig dir: {AFK_HOME}"
         )
-        raise SystemExit(1)
+        raise click.exceptions.Exit(1)
     return cfg
 
 
@@ -329,16 +385,13 @@ def _require_setup() -> SlackConfig:
 def enable(target: str) -> None:
     """Enable Slack routing for a session ID or 'all'."""
     config = _require_setup()
-    state = load_state()
 
     if target == "all":
-        state["enabled"] = "all"
-        save_state(state)
+        append_state_op("enable", "all")
         click.echo(f"Enabled for all sessions.  (config: {AFK_HOME})")
         return
 
-    enabled = state.get("enabled", [])
-    if enabled == "all":
+    if all_sessions_enabled():
         click.echo("Already enabled for all sessions.")
         return
 
@@ -347,12 +400,10 @@ def enable(target: str) -> None:
             f"Error: Session {target} not found in any registered Claude home.",
             err=True,
         )
-        raise SystemExit(1)
+        raise click.exceptions.Exit(1)
 
-    if target not in enabled:
-        enabled.append(target)
-    state["enabled"] = enabled
-    save_state(state)
+    if target not in load_state()["sessions_set"]:
+        append_state_op("enable", target)
     click.echo(f"Enabled for session {target}  (config: {AFK_HOME})")
 
 
@@ -361,16 +412,13 @@ def enable(target: str) -> None:
 def disable(target: str) -> None:
     """Disable Slack routing for a session ID or 'all'."""
     config = _require_setup()
-    state = load_state()
 
     if target == "all":
-        state["enabled"] = []
-        save_state(state)
+        append_state_op("disable", "all")
         click.echo(f"Disabled for all sessions.  (config: {AFK_HOME})")
         return
 
-    enabled = state.get("enabled", [])
-    if enabled == "all":
+    if all_sessions_enabled():
         click.echo(
             "Currently enabled for all. Use `disable all` first, then enable specific sessions."
         )
@@ -381,12 +429,10 @@ def disable(target: str) -> None:
             f"Error: Session {target} not found in any registered Claude home.",
             err=True,
         )
-        raise SystemExit(1)
+        raise click.exceptions.Exit(1)
 
-    if target in enabled:
-        enabled.remove(target)
-    state["enabled"] = enabled
-    save_state(state)
+    if target in load_state()["sessions_set"]:
+        append_state_op("disable", target)
 
     # Clean up session permission cache
     session_dir = AFK_HOME / "sessions" / target
@@ -409,15 +455,15 @@ def status() -> None:
     click.echo(f"Slack user:    {config.user_id}")
     click.echo(f"DM channel:    {config.dm_channel_id}")
     click.echo(f"Timeout:       {config.timeout}s")
+    click.echo(f"Poll interval: up to {config.poll_interval:g}s")
     click.echo(f"Claude homes:  {', '.join(config.claude_homes) or '(none)'}")
 
     state = load_state()
-    enabled = state.get("enabled", [])
     click.echo()
-    if enabled == "all":
+    if state["mode"] == "all":
         click.echo("Sessions:      ALL enabled")
-    elif enabled:
-        click.echo(f"Sessions:      {', '.join(enabled)}")
+    elif state["sessions"]:
+        click.echo(f"Sessions:      {', '.join(state['sessions'])}")
     else:
         click.echo("Sessions:      none enabled")
 
@@ -450,21 +496,14 @@ def uninstall(claude_home: str | None) -> None:
 
     for home in homes_to_remove:
         if _uninstall_hooks(home):
-            click.echo(f"Removed claude-afk hooks from {Path(home) / 'settings.json'}")
+            click.echo(f"Removed claude-afk hooks from {_settings_path(home)}")
         else:
-            click.echo(f"No claude-afk hooks found in {Path(home) / 'settings.json'}")
+            click.echo(f"No claude-afk hooks found in {_settings_path(home)}")
 
         if home in remaining_homes:
             remaining_homes.remove(home)
 
-    updated = SlackConfig(
-        bot_token=config.bot_token,
-        socket_mode_token=config.socket_mode_token,
-        user_id=config.user_id,
-        dm_channel_id=config.dm_channel_id,
-        timeout=config.timeout,
-        claude_homes=remaining_homes,
-    )
+    updated = replace(config, claude_homes=remaining_homes)
     updated.save()
 
     removed_count = len(homes_to_remove)
@@ -483,23 +522,16 @@ def add_home(path: str) -> None:
 
     if not Path(expanded).is_dir():
         click.echo(f"Error: {expanded} is not an existing directory.", err=True)
-        raise SystemExit(1)
+        raise click.exceptions.Exit(1)
 
     if expanded in config.claude_homes:
         click.echo(f"{expanded} is already registered.")
         return
 
     _install_hooks(expanded)
-    click.echo(f"Hooks installed in {Path(expanded) / 'settings.json'}")
+    click.echo(f"Hooks installed in {_settings_path(expanded)}")
 
     new_homes = [*list(config.claude_homes), expanded]
-    updated = SlackConfig(
-        bot_token=config.bot_token,
-        socket_mode_token=config.socket_mode_token,
-        user_id=config.user_id,
-        dm_channel_id=config.dm_channel_id,
-        timeout=config.timeout,
-        claude_homes=new_homes,
-    )
+    updated = replace(config, claude_homes=new_homes)
     updated.save()
     click.echo(f"Registered {expanded} as a Claude home.  (config: {AFK_HOME})")
@@ -2,21 +2,38 @@
 
 All persistent state lives under ~/.claude-afk/:
   config.json        — Slack tokens, user ID, DM channel (chmod 600)
-  state.json         — which sessions are enabled for Slack routing
+  state.json         — which sessions are enabled for Slack routing (snapshot)
+  state.log          — enable/disable ops appended since the last snapshot
+  enabled_all        — empty marker file present while "enable all" is on
   slack/threads/     — per-session Slack thread state
+  cache/             — rules parsed from CC settings files, keyed by stat;
+                       the bot user ID per token hash
   logs/              — debug logs
 """
 
 from __future__ import annotations
 
+import contextlib
+import copy
+import fcntl
+import functools
 import json
 import logging
+import math
 import os
 import stat
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import BinaryIO
+
+from claude_afk import _json
 
 DEFAULT_TIMEOUT = 1800  # 30 minutes — generous for AFK usage
+DEFAULT_POLL_INTERVAL = 10.0  # longest gap between poll-mode Slack checks, seconds
 MAX_SLACK_TEXT = 4000
 
 AFK_HOME = Path(os.environ.get("CLAUDE_AFK_HOME", "~/.claude-afk")).expanduser()
@@ -24,17 +41,81 @@ BRIDGE_LOCK_PATH = AFK_HOME / "bridge" / "sm.lock"
 
 log = logging.getLogger("claude-afk")
 
+# Parsed config/state cached per process, keyed by the file's stat signature
+# so any rewrite (by us or another process) invalidates the entry.
+_cache_lock = threading.Lock()
+_config_cache: tuple[tuple, SlackConfig] | None = None
+_state_cache: tuple[tuple, dict] | None = None
+
+
+def _stat_signature(path: Path) -> tuple | None:
+    """Return ``(path, mtime_ns, size, inode)`` for *path*, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _clear_caches() -> None:
+    global _config_cache, _state_cache
+    with _cache_lock:
+        _config_cache = None
+        _state_cache = None
+
 
 def setup_logging() -> None:
-    """Configure logging to write to ~/.claude-afk/logs/claude-afk.log."""
-    ensure_home()
-    log_path = AFK_HOME / "logs" / "claude-afk.log"
-    handler = logging.FileHandler(log_path)
-    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    """Configure logging to write to ~/.claude-afk/logs/claude-afk.log.
+
+    A no-op once the logger has any handler (ours from an earlier call, or
+    one installed by a host app or pytest), so the log file is only opened
+    when the handler will actually be attached.
+    """
     root = logging.getLogger("claude-afk")
     root.setLevel(logging.DEBUG)
-    if not root.handlers:
-        root.addHandler(handler)
+    if root.handlers:
+        return
+    ensure_home()
+    handler = logging.FileHandler(AFK_HOME / "logs" / "claude-afk.log")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    root.addHandler(handler)
+
+
+@contextlib.contextmanager
+def atomic_writer(
+    path: Path, *, mode: int | None = None, buffering: int = -1
+) -> Iterator[BinaryIO]:
+    """Open a temp sibling of *path* for binary writing; rename it over *path* on success.
+
+    Readers only ever see the old or the new contents, never a partial file.
+    Symlinks are followed so the link itself survives.  The file gets *mode*
+    if given, otherwise the existing file's permissions (0600 for new files).
+    """
+    target = Path(os.path.realpath(path))
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(target).st_mode)
+        except OSError:
+            mode = None
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        if mode is not None:
+            os.fchmod(fd, mode)
+        with open(fd, "wb", buffering=buffering) as f:
+            yield f
+        os.replace(tmp, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def write_file(path: Path, data: bytes, *, mode: int | None = None) -> None:
+    """Atomically replace *path* with *data* (see :func:`atomic_writer`)."""
+    with atomic_writer(path, mode=mode, buffering=0) as f:
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view) :]
 
 
 def ensure_home() -> None:
@@ -45,6 +126,17 @@ def ensure_home() -> None:
     (AFK_HOME / "bridge").mkdir(parents=True, exist_ok=True)
 
 
+def _parse_poll_interval(value: object) -> float:
+    """Coerce a config.json ``poll_interval`` to float, or fall back to the default."""
+    if value is None or isinstance(value, bool):
+        return DEFAULT_POLL_INTERVAL
+    try:
+        interval = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_POLL_INTERVAL
+    return interval if math.isfinite(interval) else DEFAULT_POLL_INTERVAL
+
+
 @dataclass(frozen=True)
 class SlackConfig:
     """Slack connection configuration, loaded from ~/.claude-afk/config.json."""
@@ -54,26 +146,37 @@ class SlackConfig:
     user_id: str = ""
     dm_channel_id: str = ""
     timeout: int = DEFAULT_TIMEOUT
+    poll_interval: float = DEFAULT_POLL_INTERVAL
     claude_homes: list[str] = field(default_factory=list)
 
     @classmethod
     def from_file(cls) -> SlackConfig:
+        """Load config, reusing the cached instance while the file is unchanged."""
+        global _config_cache
         path = AFK_HOME / "config.json"
-        if not path.exists():
+        sig = _stat_signature(path)
+        if sig is None:
             return cls()
+        with _cache_lock:
+            if _config_cache is not None and _config_cache[0] == sig:
+                return _config_cache[1]
         try:
-            with open(path) as f:
-                data = json.load(f)
-            return cls(
+            with open(path, "rb") as f:
+                data = _json.loads(f.read())
+            config = cls(
                 bot_token=data.get("slack_bot_token", ""),
                 socket_mode_token=data.get("slack_socket_mode_token", ""),
                 user_id=data.get("slack_user_id", ""),
                 dm_channel_id=data.get("slack_dm_channel_id", ""),
                 timeout=data.get("timeout", DEFAULT_TIMEOUT),
+                poll_interval=_parse_poll_interval(data.get("poll_interval")),
                 claude_homes=data.get("claude_homes", []),
             )
         except (json.JSONDecodeError, OSError):
             return cls()
+        with _cache_lock:
+            _config_cache = (sig, config)
+        return config
 
     def save(self) -> None:
         """Persist config to ~/.claude-afk/config.json with restricted permissions."""
@@ -85,12 +188,11 @@ class SlackConfig:
             "slack_user_id": self.user_id,
             "slack_dm_channel_id": self.dm_channel_id,
             "timeout": self.timeout,
+            "poll_interval": self.poll_interval,
             "claude_homes": self.claude_homes,
         }
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
-            f.write("\n")
-        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)  # 600
+        write_file(path, _json.dumps(data, indent=True), mode=stat.S_IRUSR | stat.S_IWUSR)  # 600
+        _clear_caches()
 
     def is_valid(self) -> bool:
         return bool(
@@ -98,42 +200,210 @@ class SlackConfig:
         )
 
 
-def load_state() -> dict:
-    """Load session state from ~/.claude-afk/state.json."""
-    path = AFK_HOME / "state.json"
-    if not path.exists():
-        return {"enabled": []}
+# state.json is a snapshot; enable/disable append ops to state.log, which is
+# replayed on load and folded back into the snapshot once it grows past this.
+STATE_LOG_COMPACT_BYTES = 64 * 1024
+
+
+def _enabled_all_path() -> Path:
+    # "enable all" is the existence of this empty file, so the hook hot path
+    # can answer with a single stat instead of reading and parsing state.
+    return AFK_HOME / "enabled_all"
+
+
+def _set_enabled_all(enabled: bool) -> None:
+    if enabled:
+        _enabled_all_path().touch()
+    else:
+        _enabled_all_path().unlink(missing_ok=True)
+
+
+def _normalize_state(raw: dict) -> dict:
+    """Return ``{"mode": "all"|"explicit", "sessions": set}`` from a snapshot.
+
+    Also accepts the legacy ``{"enabled": "all" | [session IDs]}`` layout,
+    which is rewritten in the new layout on the next snapshot write.
+    """
+    if "mode" in raw:
+        mode = "all" if raw["mode"] == "all" else "explicit"
+        sessions = raw.get("sessions", [])
+    else:
+        enabled = raw.get("enabled", [])
+        mode = "all" if enabled == "all" else "explicit"
+        sessions = enabled if mode == "explicit" else []
+    if mode == "all" or not isinstance(sessions, (list, set, frozenset)):
+        sessions = []
+    return {"mode": mode, "sessions": set(sessions)}
+
+
+def _apply_state_op(state: dict, entry: dict) -> None:
+    """Apply one ``{"op": "enable"|"disable", "target": ...}`` log entry to *state*."""
+    op = entry.get("op")
+    target = entry.get("target")
+    if op not in ("enable", "disable") or not isinstance(target, str):
+        return
+    if target == "all":
+        state["mode"] = "all" if op == "enable" else "explicit"
+        state["sessions"] = set()
+    elif state["mode"] == "explicit":
+        if op == "enable":
+            state["sessions"].add(target)
+        else:
+            state["sessions"].discard(target)
+
+
+def _read_state_unlocked(log_file: BinaryIO | None) -> dict:
+    """Read the state.json snapshot and replay *log_file* on top of it.
+
+    Returns ``{"mode", "sessions", "sessions_set"}`` — sessions as a sorted
+    list plus a frozenset for O(1) membership tests.
+    """
     try:
-        with open(path) as f:
-            return json.load(f)
+        with open(AFK_HOME / "state.json", "rb") as f:
+            raw = _json.loads(f.read())
     except (json.JSONDecodeError, OSError):
-        return {"enabled": []}
+        raw = {}
+    state = _normalize_state(raw if isinstance(raw, dict) else {})
+    if log_file is not None:
+        log_file.seek(0)
+        for line in log_file:
+            try:
+                entry = _json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written trailing line
+            if isinstance(entry, dict):
+                _apply_state_op(state, entry)
+    sessions = state["sessions"]
+    return {
+        "mode": state["mode"],
+        "sessions": sorted(sessions),
+        "sessions_set": frozenset(sessions),
+    }
+
+
+def _write_snapshot_locked(state: dict, log_file: BinaryIO) -> None:
+    """Write *state* as the new snapshot and empty the log (caller holds LOCK_EX).
+
+    The snapshot only holds per-session enables; "all" mode is carried by
+    the ``enabled_all`` marker file.
+    """
+    state = _normalize_state(state)
+    _set_enabled_all(state["mode"] == "all")
+    data = {"mode": "explicit", "sessions": sorted(state["sessions"])}
+    write_file(AFK_HOME / "state.json", _json.dumps(data))
+    os.ftruncate(log_file.fileno(), 0)
+
+
+def load_state() -> dict:
+    """Load session state from ~/.claude-afk/state.json plus the state.log ops.
+
+    The parsed state is cached while neither file changes; callers get a
+    deep copy so they can mutate it freely before :func:`save_state`.
+    """
+    global _state_cache
+    log_path = AFK_HOME / "state.log"
+    enabled_all = _enabled_all_path().exists()
+    sig = (_stat_signature(AFK_HOME / "state.json"), _stat_signature(log_path), enabled_all)
+    if sig[:2] == (None, None):
+        mode = "all" if enabled_all else "explicit"
+        return {"mode": mode, "sessions": [], "sessions_set": frozenset()}
+    with _cache_lock:
+        if _state_cache is not None and _state_cache[0] == sig:
+            return copy.deepcopy(_state_cache[1])
+    try:
+        log_file = open(log_path, "rb")  # noqa: SIM115 — closed below
+    except OSError:
+        log_file = None
+    try:
+        if log_file is not None:
+            fcntl.flock(log_file, fcntl.LOCK_SH)
+        state = _read_state_unlocked(log_file)
+    finally:
+        if log_file is not None:
+            log_file.close()
+    if enabled_all:
+        state["mode"] = "all"
+    with _cache_lock:
+        _state_cache = (sig, state)
+    return copy.deepcopy(state)
 
 
 def save_state(state: dict) -> None:
-    """Save session state to ~/.claude-afk/state.json."""
+    """Replace session state: write ~/.claude-afk/state.json and clear state.log."""
+    ensure_home()
+    with open(AFK_HOME / "state.log", "ab") as log_file:
+        fcntl.flock(log_file, fcntl.LOCK_EX)
+        _write_snapshot_locked(state, log_file)
+    _clear_caches()
+
+
+def append_state_op(op: str, target: str) -> None:
+    """Record ``enable``/``disable`` of *target* (a session ID or "all").
+
+    Appends one line to state.log instead of rewriting state.json; the log
+    is compacted into the snapshot once it exceeds
+    :data:`STATE_LOG_COMPACT_BYTES`.  Targeting "all" also creates or
+    removes the ``enabled_all`` marker.
+    """
     ensure_home()
-    path = AFK_HOME / "state.json"
-    with open(path, "w") as f:
-        json.dump(state, f, indent=2)
-        f.write("\n")
+    line = _json.dumps({"op": op, "target": target, "ts": time.time()}) + b"\n"
+    with open(AFK_HOME / "state.log", "ab") as log_file:
+        fcntl.flock(log_file, fcntl.LOCK_EX)
+        log_file.write(line)
+        log_file.flush()
+        if target == "all":
+            _set_enabled_all(op == "enable")
+        if log_file.tell() > STATE_LOG_COMPACT_BYTES:
+            with open(AFK_HOME / "state.log", "rb") as reader:
+                state = _read_state_unlocked(reader)
+            _write_snapshot_locked(state, log_file)
+    _clear_caches()
+
+
+def all_sessions_enabled() -> bool:
+    """Return True if "enable all" is on (a single stat, no state parsing)."""
+    return _enabled_all_path().exists()
 
 
 def is_session_enabled(session_id: str) -> bool:
     """Check if a session is enabled for Slack routing."""
-    state = load_state()
-    enabled = state.get("enabled", [])
-    if enabled == "all":
+    if all_sessions_enabled():
         return True
-    if isinstance(enabled, list):
-        return session_id in enabled
-    return False
+    state = load_state()
+    return state["mode"] == "all" or session_id in state["sessions_set"]
+
+
+def _project_dirs(projects_dir: str) -> tuple[tuple[str, int], ...] | None:
+    """Return ``(path, mtime_ns)`` for each project directory, or None if absent."""
+    try:
+        with os.scandir(projects_dir) as it:
+            return tuple(
+                sorted((entry.path, entry.stat().st_mtime_ns) for entry in it if entry.is_dir())
+            )
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _session_ids(project_dirs: tuple[tuple[str, int], ...]) -> frozenset[str]:
+    """Session IDs (``*.jsonl`` stems) found across *project_dirs*.
+
+    Keyed by the directory mtimes, so a new session file invalidates the entry.
+    """
+    ids: set[str] = set()
+    for path, _mtime in project_dirs:
+        try:
+            with os.scandir(path) as it:
+                ids.update(entry.name[:-6] for entry in it if entry.name.endswith(".jsonl"))
+        except OSError:
+            continue
+    return frozenset(ids)
 
 
 def session_exists(session_id: str, claude_homes: list[str]) -> bool:
     """Check if a session JSONL file exists in any registered claude-home."""
     for home in claude_homes:
-        projects_dir = Path(home) / "projects"
-        if projects_dir.is_dir() and list(projects_dir.glob(f"*/{session_id}.jsonl")):
+        project_dirs = _project_dirs(os.path.join(home, "projects"))
+        if project_dirs and session_id in _session_ids(project_dirs):
             return True
     return False
@@ -0,0 +1,29 @@
+"""Claude Code hook handlers (one module per hook event)."""
+
+from __future__ import annotations
+
+import json
+import sys
+
+from claude_afk import _json
+
+
+def read_input() -> dict:
+    """Read the hook's JSON payload from stdin; {} if empty or malformed.
+
+    Reads raw bytes and decodes them in one call (orjson when available)
+    rather than letting ``json.load`` pull text through the stdin wrapper.
+    """
+    raw = sys.stdin.buffer.read()
+    try:
+        data = _json.loads(raw) if raw.strip() else {}
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def write_output(result: dict) -> None:
+    """Write the hook's JSON response to stdout as one line of UTF-8 bytes."""
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_json.dumps(result) + b"\n")
+    sys.stdout.buffer.flush()
@@ -7,17 +7,19 @@ or completes a task. Uses the bot token to post directly to the DM channel
 
 from __future__ import annotations
 
-import json
 import logging
 import os
+import random
 import sys
-
-from slack_sdk import WebClient
+import time
 
 from claude_afk.config import SlackConfig, is_session_enabled, setup_logging
+from claude_afk.hooks import read_input
 
 log = logging.getLogger("claude-afk.hooks.notify")
 
+_MAX_RETRY_WAIT = 2.0  # cap on Slack's Retry-After before the single retry
+
 
 def _format_stop(data: dict) -> str:
     cwd = data.get("cwd", "unknown directory")
@@ -49,15 +51,35 @@ def run(data: dict, config: SlackConfig, event: str) -> bool:
     else:
         return False
 
-    client = WebClient(token=config.bot_token)
-    try:
-        resp = client.chat_postMessage(channel=config.dm_channel_id, text=message)
-        ok = resp.get("ok", False)
-        log.debug("notify posted event=%s ok=%s", event, ok)
-        return ok
-    except Exception:
-        log.exception("Failed to send Slack notification")
-        return False
+    # Imported here so early exits never pay for loading slack_sdk.
+    from slack_sdk.errors import SlackApiError
+
+    from claude_afk.slack.client import get_web_client
+
+    client = get_web_client(config.bot_token)
+    for attempt in range(2):
+        try:
+            resp = client.chat_postMessage(channel=config.dm_channel_id, text=message)
+            ok = resp.get("ok", False)
+            log.debug("notify posted event=%s ok=%s", event, ok)
+            return ok
+        except SlackApiError as e:
+            if attempt or e.response.get("error") != "ratelimited":
+                log.exception("Failed to send Slack notification")
+                return False
+            retry_after = float(e.response.headers.get("Retry-After", 1))
+            delay = min(retry_after, _MAX_RETRY_WAIT)
+        except TimeoutError:
+            if attempt:
+                log.exception("Slack notification timed out")
+                return False
+            delay = 0.25
+        except Exception:
+            log.exception("Failed to send Slack notification")
+            return False
+        log.debug("notify retrying in %.2fs", delay)
+        time.sleep(delay + random.uniform(0, 0.25))
+    return False
 
 
 def main(event: str = "notification") -> None:
@@ -68,10 +90,7 @@ def main(event: str = "notification") -> None:
             file=sys.stderr,
         )
         sys.exit(1)
-    try:
-        data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        data = {}
+    data = read_input()
 
     session_id = data.get("session_id", "")
     log.debug("notify hook fired session=%s event=%s", session_id, event)
@@ -10,14 +10,15 @@ Deny (with feedback) → CC revises the plan and re-enters plan mode.
 
 from __future__ import annotations
 
-import json
 import logging
 import sys
+from typing import TYPE_CHECKING
 
 from claude_afk.config import SlackConfig, is_session_enabled, setup_logging
-from claude_afk.permissions import Decision
-from claude_afk.slack.bridge import REPLY_ALLOW, REPLY_DENY, SlackBridge
-from claude_afk.slack.formatting import format_plan_approval
+from claude_afk.hooks import read_input, write_output
+
+if TYPE_CHECKING:
+    from claude_afk.permissions import Decision
 
 log = logging.getLogger("claude-afk.hooks.planapproval")
 
@@ -33,10 +34,14 @@ def _emit(behavior: Decision, message: str | None = None) -> None:
             "decision": decision,
         },
     }
-    print(json.dumps(result))
+    write_output(result)
 
 
 def run(data: dict, config: SlackConfig) -> None:
+    # Deferred so main() only loads what it needs to decide whether to run.
+    from claude_afk.permissions import Decision
+    from claude_afk.slack.formatting import format_plan_approval
+
     session_id = data.get("session_id", "unknown")
     tool_input = data.get("tool_input", {})
 
@@ -50,6 +55,9 @@ def run(data: dict, config: SlackConfig) -> None:
 
     text = format_plan_approval(plan, allowed_prompts or None)
 
+    # Deferred so disabled/misconfigured sessions never import slack_sdk.
+    from claude_afk.slack.bridge import REPLY_ALLOW, REPLY_DENY, SlackBridge
+
     with SlackBridge(config, session_id) as bridge:
         if not bridge.post(text):
             log.warning("failed to post plan to Slack, auto-approving")
@@ -81,10 +89,7 @@ def main() -> None:
             file=sys.stderr,
         )
         sys.exit(1)
-    try:
-        data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        data = {}
+    data = read_input()
 
     session_id = data.get("session_id", "")
     log.debug("planapproval hook fired session=%s", session_id)
@@ -10,20 +10,27 @@ otherwise race for Slack replies.
 
 from __future__ import annotations
 
+import contextlib
 import fcntl
-import json
 import logging
+import os
+import re
 import sys
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
 from claude_afk.config import SlackConfig, is_session_enabled, setup_logging
+from claude_afk.hooks import read_input, write_output
 from claude_afk.permissions import (
     TOOL_POLICIES,
     Decision,
     ToolPolicy,
+    approved_bash_prefixes,
     build_session_rule,
     check_bash_prefixes,
     check_session_permission,
     get_tool_input_value,
+    index_rules,
     is_sensitive_path,
     load_cc_permission_rules,
     save_bash_prefixes,
@@ -31,13 +38,9 @@ from claude_afk.permissions import (
     tool_has_cc_rule,
 )
 from claude_afk.shell import extract_command_prefixes
-from claude_afk.slack.bridge import REPLY_ALLOW, REPLY_ALWAYS_ALLOW, REPLY_DENY, SlackBridge
-from claude_afk.slack.formatting import (
-    QUESTION_TIMEOUT_REMINDER,
-    TIMEOUT_REMINDER,
-    format_single_question,
-    format_tool_permission,
-)
+
+if TYPE_CHECKING:
+    from claude_afk.slack.bridge import SlackBridge
 
 log = logging.getLogger("claude-afk.hooks.pretooluse")
 
@@ -46,26 +49,22 @@ def resolve_question_answer(reply: str, question: dict) -> str:
     """Map a numbered reply back to an option label when possible."""
     reply = reply.strip()
     options = question.get("options", [])
-    multi = question.get("multiSelect", False)
+    n_options = len(options)
 
-    try:
+    # Screen with isdecimal() so free-text replies never pay for raising
+    # and catching ValueError.
+    if reply.isdecimal():
         num = int(reply)
-        if 1 <= num <= len(options):
+        if 1 <= num <= n_options:
             return options[num - 1].get("label", reply)
-    except ValueError:
-        pass
 
-    if multi and "," in reply:
-        parts = [p.strip() for p in reply.split(",")]
+    if question.get("multiSelect", False) and "," in reply:
         labels: list[str] = []
-        for p in parts:
-            try:
-                num = int(p)
-                if 1 <= num <= len(options):
-                    labels.append(options[num - 1].get("label", p))
-                else:
-                    labels.append(p)
-            except ValueError:
+        for p in reply.split(","):
+            p = p.strip()
+            if p.isdecimal() and 1 <= (num := int(p)) <= n_options:
+                labels.append(options[num - 1].get("label", p))
+            else:
                 labels.append(p)
         if labels:
             return ", ".join(labels)
@@ -82,47 +81,82 @@ def _emit(decision: Decision, reason: str) -> None:
             "permissionDecisionReason": reason,
         },
     }
-    print(json.dumps(result))
+    write_output(result)
+
+
+# "2: answer" / "2) answer" targets a specific question in a batched reply.
+_NUMBERED_ANSWER_RE = re.compile(r"^(\d+)\s*[:)]\s*(.+)$")
+
+
+def _fill_answers(reply: str, questions: list[dict], answers: list[str | None]) -> None:
+    """Assign *reply* to unanswered questions.
+
+    Lines are spread over the questions only when every line is ``N: answer``
+    or there is exactly one line per unanswered question; otherwise the
+    whole reply (possibly multi-line free text) answers the first open one.
+    """
+    if len(questions) == 1:
+        answers[0] = resolve_question_answer(reply, questions[0])
+        return
+    lines = [line.strip() for line in reply.splitlines() if line.strip()]
+    if not lines:
+        return
+    numbered = []
+    for line in lines:
+        m = _NUMBERED_ANSWER_RE.match(line)
+        numbered.append(m if m and 1 <= int(m.group(1)) <= len(questions) else None)
+    if None in numbered and len(lines) != answers.count(None):
+        idx = answers.index(None)
+        answers[idx] = resolve_question_answer(reply, questions[idx])
+        return
+    for line, m in zip(lines, numbered, strict=True):
+        if m:
+            idx, line = int(m.group(1)) - 1, m.group(2)
+        else:
+            idx = next((i for i, a in enumerate(answers) if a is None), None)
+            if idx is None:
+                break
+        answers[idx] = resolve_question_answer(line, questions[idx])
 
 
 def _handle_ask_user_question(
     bridge: SlackBridge,
     questions: list[dict],
 ) -> None:
-    """Post questions one at a time, collect answers, deny with combined response."""
+    """Post all questions in one message, collect answers, deny with combined response.
+
+    Answers may arrive in one reply (one per line) or spread over several;
+    we keep waiting until every question has one.
+    """
+    from claude_afk.slack.formatting import QUESTION_TIMEOUT_REMINDER, format_questions
+
     total = len(questions)
-    answers: list[str] = []
+    answers: list[str | None] = [None] * total
 
-    for qi, q in enumerate(questions):
-        text = format_single_question(q, qi + 1, total)
-        if not bridge.post(text):
-            return
+    if not bridge.post(format_questions(questions)):
+        return
 
-        while True:
-            reply = bridge.wait_for_reply()
-            if reply is not None:
-                break
-            log.debug("question %d/%d timed out, posting reminder", qi + 1, total)
+    while None in answers:
+        reply = bridge.wait_for_reply()
+        if reply is None:
+            log.debug("questions timed out, posting reminder")
             if not bridge.post(QUESTION_TIMEOUT_REMINDER):
                 return
-
-        answer = resolve_question_answer(reply, q)
-        answers.append(answer)
+            continue
+        _fill_answers(reply, questions, answers)
 
     if total == 1:
         combined = answers[0]
+        confirm = f"*{questions[0].get('header', 'Q1')}:* {combined}"
     else:
         parts: list[str] = []
-        for qi, (q, a) in enumerate(zip(questions, answers, strict=True)):
-            header = q.get("header", f"Question {qi + 1}")
-            parts.append(f"{header}: {a}")
+        confirm_parts = [f":white_check_mark: *All {total} answers received*\n"]
+        for qi, (q, a) in enumerate(zip(questions, answers, strict=True), 1):
+            parts.append(f"{q.get('header', f'Question {qi}')}: {a}")
+            confirm_parts.append(f"*{q.get('header', f'Q{qi}')}:* {a}")
         combined = "; ".join(parts)
-
-    confirm_parts = [f":white_check_mark: *All {total} answers received*\n"] if total > 1 else []
-    for qi, (q, a) in enumerate(zip(questions, answers, strict=True)):
-        hdr = q.get("header", f"Q{qi + 1}")
-        confirm_parts.append(f"*{hdr}:* {a}")
-    bridge.post("\n".join(confirm_parts))
+        confirm = "\n".join(confirm_parts)
+    bridge.post(confirm)
 
     log.debug("question answers combined=%r", combined)
     _emit(Decision.DENY, f"User replied from Slack: {combined}")
@@ -143,6 +177,9 @@ def _handle_permission(
     causes CC to fall back to its native terminal prompt, which
     defeats the purpose of AFK routing.
     """
+    from claude_afk.slack.bridge import REPLY_ALLOW, REPLY_ALWAYS_ALLOW, REPLY_DENY
+    from claude_afk.slack.formatting import TIMEOUT_REMINDER, format_tool_permission
+
     text = format_tool_permission(tool_name, tool_input, unapproved_prefixes)
     if not bridge.post(text):
         return
@@ -176,23 +213,76 @@ def _handle_permission(
         _emit(Decision.DENY, f"User feedback via Slack: {reply}")
 
 
-def _check_auto_allow(tool_name: str, tool_input: dict) -> bool:
+_AUTO_ALLOW_TOOLS: frozenset[str] = frozenset(
+    tool for tool, policy in TOOL_POLICIES.items() if policy == ToolPolicy.AUTO_ALLOW
+)
+
+
+def _check_auto_allow(tool_name: str, tool_input: dict, *, value: str | None = None) -> bool:
     """Return True if the tool should be silently auto-allowed."""
-    policy = TOOL_POLICIES.get(tool_name, ToolPolicy.ALWAYS_ASK)
-    if policy != ToolPolicy.AUTO_ALLOW:
+    if tool_name not in _AUTO_ALLOW_TOOLS:
         return False
-    value = get_tool_input_value(tool_name, tool_input)
+    if value is None:
+        value = get_tool_input_value(tool_name, tool_input)
     return not is_sensitive_path(value)
 
 
+def _check_session_cache(
+    session_id: str, tool_name: str, tool_input: dict, *, value: str | None = None
+) -> bool:
+    """Emit an allow and return True if the session cache already approves the call."""
+    decision = check_session_permission(session_id, tool_name, tool_input, value=value)
+    if decision == Decision.ALLOW:
+        log.debug("tool %s matched session allow rule, auto-approving", tool_name)
+        _emit(Decision.ALLOW, "Auto-approved from session cache")
+        return True
+    if tool_name == "Bash":
+        approved = approved_bash_prefixes(session_id, tool_input.get("command", ""))
+        if approved:
+            log.debug("all bash prefixes approved, auto-allowing: %s", approved)
+            _emit(Decision.ALLOW, f"Auto-allowed (all prefixes approved: {approved})")
+            return True
+    return False
+
+
+def _session_lock_path(session_id: str) -> str:
+    """Per-session lock file, on the user's runtime dir (tmpfs) when there is one."""
+    base = os.environ.get("XDG_RUNTIME_DIR", "")
+    if not base or not os.path.isdir(base):
+        base = "/tmp"
+    return os.path.join(base, f"claude_afk_{session_id}.lock")
+
+
+@contextlib.contextmanager
+def _session_lock(session_id: str) -> Iterator[None]:
+    """Hold the per-session lock that serializes Slack conversations.
+
+    The file only carries the lock, so it is opened without ``O_TRUNC``
+    (``open(path, "w")`` truncated it on every hook).
+    """
+    lock_path = _session_lock_path(session_id)
+    log.debug("acquiring lock %s", lock_path)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        log.debug("lock acquired")
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        log.debug("lock released")
+
+
 def run(data: dict, config: SlackConfig) -> None:
     tool_name = data.get("tool_name", "")
     tool_input = data.get("tool_input", {})
     session_id = data.get("session_id", "unknown")
+    # The specifier value (command, file_path, ...) every rule check matches against.
+    value = get_tool_input_value(tool_name, tool_input)
 
     cwd = data.get("cwd", "")
-    cc_rules = load_cc_permission_rules(cwd)
-    if tool_has_cc_rule(tool_name, tool_input, cc_rules):
+    cc_rules = index_rules(load_cc_permission_rules(cwd))
+    if tool_has_cc_rule(tool_name, tool_input, cc_rules, value=value):
         log.debug("tool %s matched CC rule, skipping Slack", tool_name)
         sys.exit(0)
 
@@ -203,53 +293,46 @@ def run(data: dict, config: SlackConfig) -> None:
         sys.exit(0)
 
     # Auto-allow safe tools (Read non-sensitive, Grep, Glob)
-    if not is_ask and _check_auto_allow(tool_name, tool_input):
+    if not is_ask and _check_auto_allow(tool_name, tool_input, value=value):
         log.debug("auto-allow %s (safe tool, non-sensitive)", tool_name)
         _emit(Decision.ALLOW, f"Auto-allowed ({tool_name})")
         return
 
-    lock_path = f"/tmp/slack_bridge_{session_id}.lock"
-    log.debug("acquiring lock %s", lock_path)
-    with open(lock_path, "w") as lock_fd:
-        fcntl.flock(lock_fd, fcntl.LOCK_EX)
-        log.debug("lock acquired, connecting to Slack")
+    # Optimistic cache probe: repeat calls are answered here without touching
+    # the lock.  Misses are re-checked under the lock below, since a parallel
+    # hook may write the cache while we wait.
+    if not is_ask and _check_session_cache(session_id, tool_name, tool_input, value=value):
+        return
 
-        # Check session cache inside the lock — parallel hooks may have
+    with _session_lock(session_id):
+        # Check session cache again inside the lock — parallel hooks may have
         # written a cache entry while we were waiting for the lock.
-        cached = check_session_permission(session_id, tool_name, tool_input)
-        if cached == Decision.ALLOW:
-            log.debug("tool %s matched session allow rule, auto-approving", tool_name)
-            _emit(Decision.ALLOW, "Auto-approved from session cache")
+        if not is_ask and _check_session_cache(session_id, tool_name, tool_input, value=value):
             return
 
-        # Bash prefix auto-approval: check if all sub-command prefixes
-        # are already approved for this session.
+        # Bash prompts list only the sub-command prefixes not yet approved.
         unapproved_prefixes: list[str] | None = None
         all_prefixes: list[str] | None = None
         if not is_ask and tool_name == "Bash":
             command = tool_input.get("command", "")
-            all_approved, _approved, unapproved = check_bash_prefixes(session_id, command)
-            if all_approved and _approved:
-                log.debug("all bash prefixes approved, auto-allowing: %s", _approved)
-                _emit(Decision.ALLOW, f"Auto-allowed (all prefixes approved: {_approved})")
-                return
+            _, _, unapproved = check_bash_prefixes(session_id, command)
             if unapproved:
                 unapproved_prefixes = unapproved
                 all_prefixes = extract_command_prefixes(command)
                 log.debug("unapproved prefixes: %s", unapproved_prefixes)
 
-        try:
-            with SlackBridge(config, session_id) as bridge:
-                if is_ask:
-                    _handle_ask_user_question(bridge, questions)
-                else:
-                    _handle_permission(
-                        bridge, tool_name, tool_input, session_id,
-                        unapproved_prefixes, all_prefixes,
-                    )
-        finally:
-            fcntl.flock(lock_fd, fcntl.LOCK_UN)
-            log.debug("lock released")
+        # Deferred so the fast paths above never import slack_sdk.
+        from claude_afk.slack.bridge import SlackBridge
+
+        log.debug("connecting to Slack")
+        with SlackBridge(config, session_id) as bridge:
+            if is_ask:
+                _handle_ask_user_question(bridge, questions)
+            else:
+                _handle_permission(
+                    bridge, tool_name, tool_input, session_id,
+                    unapproved_prefixes, all_prefixes,
+                )
 
 
 def main() -> None:
@@ -260,10 +343,7 @@ def main() -> None:
             file=sys.stderr,
         )
         sys.exit(1)
-    try:
-        data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        data = {}
+    data = read_input()
 
     session_id = data.get("session_id", "")
     tool_name = data.get("tool_name", "")
@@ -7,70 +7,89 @@ reply back to Claude as a continuation prompt.
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import sys
 import time
+from typing import TYPE_CHECKING
 
 from claude_afk.config import SlackConfig, is_session_enabled, setup_logging
-from claude_afk.slack.bridge import SlackBridge
-from claude_afk.slack.formatting import md_to_mrkdwn, truncate
-from claude_afk.transcript import get_last_assistant_message, get_session_name
+from claude_afk.hooks import read_input, write_output
+
+if TYPE_CHECKING:
+    from claude_afk.transcript import StopContext
 
 log = logging.getLogger("claude-afk.hooks.stop")
 
 
-def run(data: dict, config: SlackConfig) -> None:
-    session_id = data.get("session_id", "unknown")
-    short_id = session_id[:8]
-    cwd = data.get("cwd", "")
-    project = os.path.basename(cwd) if cwd else "unknown"
-    transcript_path = data.get("transcript_path", "")
+def _read_transcript(transcript_path: str) -> StopContext:
+    from claude_afk.transcript import get_stop_context
 
     # Small delay to let Claude flush the transcript to disk
     time.sleep(1)
+    return get_stop_context(transcript_path)
+
 
-    assistant_msg = get_last_assistant_message(transcript_path)
-    session_name = get_session_name(transcript_path)
+def _build_message(session_id: str, project: str, context: StopContext) -> tuple[str, str]:
+    """Return ``(header, body)``; the header is only used for new threads."""
+    from claude_afk.slack.formatting import md_to_mrkdwn, truncate
 
-    # Build header for new threads
     header_lines = [
         f">  Session ID: `{session_id}`",
     ]
-    if session_name:
-        first_line = session_name.split("\n")[0].strip()
+    if context.session_name:
+        first_line = context.session_name.split("\n")[0].strip()
         header_lines.append(f"> Session: {first_line}")
     header_lines.append(f"> Project: `{project}`")
     header_lines.append("> Reply to this thread to continue the session.")
     header = "\n".join(header_lines)
 
-    # Build message body
-    if assistant_msg:
-        body = truncate(md_to_mrkdwn(assistant_msg))
+    if context.last_assistant_message:
+        body = truncate(md_to_mrkdwn(context.last_assistant_message))
     else:
         body = "_Claude finished (no text response)_"
+    return header, body
 
-    log.debug("stop connecting to Slack session=%s project=%s", short_id, project)
 
-    with SlackBridge(config, session_id) as bridge:
-        if bridge.thread_ts:
-            bridge.post(body)
-        else:
-            bridge.post(body, header=header)
+def run(data: dict, config: SlackConfig) -> None:
+    session_id = data.get("session_id", "unknown")
+    short_id = session_id[:8]
+    cwd = data.get("cwd", "")
+    project = os.path.basename(cwd) if cwd else "unknown"
+    transcript_path = data.get("transcript_path", "")
 
-        log.debug("stop waiting for reply session=%s", short_id)
-        reply = bridge.wait_for_reply()
+    log.debug("stop connecting to Slack session=%s project=%s", short_id, project)
 
-        if reply is not None:
-            log.debug("stop got reply session=%s reply=%r", short_id, reply[:100])
-            result = {
-                "decision": "block",
-                "reason": f"User replied from Slack: {reply}",
-            }
-            print(json.dumps(result))
-        else:
-            log.debug("stop timed out session=%s", short_id)
+    # Deferred (like the transcript and formatting imports) so main() only
+    # loads what it needs to decide whether to run; skipped sessions never
+    # import slack_sdk.
+    from concurrent.futures import ThreadPoolExecutor
+
+    from claude_afk.slack.bridge import SlackBridge
+
+    # The flush delay and transcript parse run in a worker while the bridge
+    # authenticates and connects, instead of one after the other.
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        transcript = pool.submit(_read_transcript, transcript_path)
+        with SlackBridge(config, session_id) as bridge:
+            header, body = _build_message(session_id, project, transcript.result())
+            if bridge.thread_ts:
+                bridge.post(body)
+            else:
+                bridge.post(body, header=header)
+
+            log.debug("stop waiting for reply session=%s", short_id)
+            reply = bridge.wait_for_reply()
+
+            if reply is not None:
+                log.debug("stop got reply session=%s reply=%r", short_id, reply[:100])
+                result = {
+                    "decision": "block",
+                    "reason": f"User replied from Slack: {reply}",
+                }
+                write_output(result)
+            else:
+                log.debug("stop timed out session=%s", short_id)
 
 
 def main() -> None:
@@ -81,10 +100,7 @@ def main() -> None:
             file=sys.stderr,
         )
         sys.exit(1)
-    try:
-        data = json.load(sys.stdin)
-    except json.JSONDecodeError:
-        data = {}
+    data = read_input()
 
     session_id = data.get("session_id", "")
     log.debug("stop hook fired session=%s", session_id)
@@ -10,14 +10,20 @@ Also manages a per-session permission cache so that repeated tool calls
 
 from __future__ import annotations
 
+import fcntl
 import fnmatch
+import functools
 import json
 import os
+import re
+from collections.abc import Iterable
 from enum import Enum
 from pathlib import Path
+from typing import BinaryIO, NamedTuple
 
-from claude_afk.config import AFK_HOME
-from claude_afk.shell import extract_command_prefixes
+from claude_afk import _json
+from claude_afk.config import AFK_HOME, _stat_signature, write_file
+from claude_afk.shell import extract_command_prefixes, iter_command_prefixes
 
 
 class ToolPolicy(str, Enum):
@@ -51,15 +57,45 @@ _TOOL_SPECIFIER_FIELD: dict[str, str] = {
 
 def _load_json_permissions(path: str) -> list[str]:
     """Load the permissions.allow + permissions.deny lists from a JSON file."""
-    if not os.path.exists(path):
-        return []
     try:
-        with open(path) as f:
-            data = json.load(f)
-        perms = data.get("permissions", {})
-        return perms.get("allow", []) + perms.get("deny", [])
+        with open(path, "rb") as f:
+            data = _json.loads(f.read())
     except (json.JSONDecodeError, OSError):
         return []
+    perms = data.get("permissions", {}) if isinstance(data, dict) else {}
+    if not isinstance(perms, dict):
+        return []
+    return perms.get("allow", []) + perms.get("deny", [])
+
+
+# Rules extracted from CC settings files are memoized on disk (per settings
+# path, keyed by its stat signature) so each hook process only parses the
+# small rule lists instead of every full settings.json.  Entries already
+# validated in this process are kept in _rules_memo too.
+_RULES_CACHE_MAX_ENTRIES = 64
+_rules_memo: dict[str, tuple[list[int], list[str]]] = {}
+
+
+def _rules_cache_path() -> Path:
+    return AFK_HOME / "cache" / "cc_rules.json"
+
+
+def _read_rules_cache() -> dict:
+    try:
+        with open(_rules_cache_path(), "rb") as f:
+            data = _json.loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_rules_cache(cache: dict) -> None:
+    path = _rules_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_file(path, _json.dumps(cache), mode=0o600)
+    except OSError:
+        pass  # cache is best-effort
 
 
 def load_cc_permission_rules(cwd: str) -> list[str]:
@@ -70,50 +106,114 @@ def load_cc_permission_rules(cwd: str) -> list[str]:
       2. <project>/.claude/settings.local.json (project-local, gitignored)
       3. <project>/.claude/settings.json (project-shared)
 
-    Returns a combined list of all allow + deny rule strings.
+    Returns a combined list of all allow + deny rule strings.  Setting
+    ``CLAUDE_AFK_NO_CC_RULES=1`` skips the lookup entirely (every call is
+    then routed to Slack).
     """
+    if os.environ.get("CLAUDE_AFK_NO_CC_RULES"):
+        return []
+    config_dir = os.environ.get("CLAUDE_CONFIG_DIR", os.path.expanduser("~/.claude"))
+    paths = [os.path.join(config_dir, "settings.json")]
+    # One stat on the project's .claude/ dir saves two failing ones when absent.
+    project_dir = os.path.join(cwd, ".claude") if cwd else ""
+    if project_dir and os.path.isdir(project_dir):
+        paths.append(os.path.join(project_dir, "settings.local.json"))
+        paths.append(os.path.join(project_dir, "settings.json"))
+
     rules: list[str] = []
+    cache: dict | None = None
+    dirty = False
+    for path in paths:
+        sig = _stat_signature(Path(path))
+        if sig is None:
+            continue
+        key = list(sig[1:])
+        memo = _rules_memo.get(path)
+        if memo is not None and memo[0] == key:
+            rules.extend(memo[1])
+            continue
+        if cache is None:
+            cache = _read_rules_cache()
+        entry = cache.get(path)
+        if isinstance(entry, dict) and entry.get("sig") == key:
+            file_rules = entry.get("rules", [])
+        else:
+            file_rules = _load_json_permissions(path)
+            cache[path] = {"sig": key, "rules": file_rules}
+            dirty = True
+        _rules_memo[path] = (key, file_rules)
+        rules.extend(file_rules)
+
+    if dirty and cache is not None:
+        if len(cache) > _RULES_CACHE_MAX_ENTRIES:
+            cache = {p: cache[p] for p in paths if p in cache}
+        _write_rules_cache(cache)
+    return rules
 
-    config_dir = os.environ.get("CLAUDE_CONFIG_DIR", os.path.expanduser("~/.claude"))
-    rules.extend(_load_json_permissions(os.path.join(config_dir, "settings.json")))
 
-    if cwd:
-        rules.extend(
-            _load_json_permissions(os.path.join(cwd, ".claude", "settings.local.json"))
-        )
-        rules.extend(
-            _load_json_permissions(os.path.join(cwd, ".claude", "settings.json"))
-        )
+class RuleIndex(NamedTuple):
+    """A rule list grouped for matching: bare tool names and compiled globs per tool."""
 
-    return rules
+    bare: frozenset[str]
+    patterned: dict[str, tuple[re.Pattern[str], ...]]
 
 
-def tool_has_cc_rule(tool_name: str, tool_input: dict, rules: list[str]) -> bool:
+def index_rules(rules: Iterable[object]) -> RuleIndex:
+    """Index *rules* for :func:`tool_has_cc_rule`.
+
+    Build it once where the rules are loaded and reuse it for every check.
+    Entries that aren't strings (malformed settings files) are skipped.
+    """
+    bare: set[str] = set()
+    patterned: dict[str, list[re.Pattern[str]]] = {}
+    for rule in rules:
+        if not isinstance(rule, str):
+            continue
+        tool, pattern = _compile_rule(rule)
+        if pattern is None:
+            bare.add(tool)
+        else:
+            patterned.setdefault(tool, []).append(pattern)
+    return RuleIndex(frozenset(bare), {tool: tuple(pats) for tool, pats in patterned.items()})
+
+
+def tool_has_cc_rule(
+    tool_name: str,
+    tool_input: dict,
+    rules: Iterable[str] | RuleIndex,
+    *,
+    value: str | None = None,
+) -> bool:
     """Check if a tool call matches any CC permission rule.
 
     Rule formats:
       "Bash"              — matches all Bash calls
       "Bash(npm run *)"   — matches Bash calls where command matches glob
       "Read(~/.zshrc)"    — matches Read calls for that file path
-    """
-    for rule in rules:
-        if "(" in rule and rule.endswith(")"):
-            rule_tool = rule[: rule.index("(")]
-            rule_pattern = rule[rule.index("(") + 1 : -1]
 
-            if rule_tool != tool_name:
-                continue
+    *rules* is a :class:`RuleIndex` from :func:`index_rules`, or a plain rule
+    list (indexed on the spot).  *value* is the call's specifier value if the
+    caller already looked it up (see :func:`get_tool_input_value`); tools
+    without a specifier field never match a parenthesised rule.
+    """
+    index = rules if isinstance(rules, RuleIndex) else index_rules(rules)
+    if tool_name in index.bare:
+        return True
+    patterns = index.patterned.get(tool_name)
+    if not patterns or tool_name not in _TOOL_SPECIFIER_FIELD:
+        return False
+    if value is None:
+        value = get_tool_input_value(tool_name, tool_input)
+    return any(p.match(value) for p in patterns)
 
-            field = _TOOL_SPECIFIER_FIELD.get(tool_name, "")
-            if field:
-                value = tool_input.get(field, "")
-                if fnmatch.fnmatch(value, rule_pattern):
-                    return True
-        else:
-            if rule == tool_name:
-                return True
 
-    return False
+@functools.lru_cache(maxsize=1024)
+def _compile_rule(rule: str) -> tuple[str, re.Pattern[str] | None]:
+    """Split ``"Tool(glob)"`` into the tool name and its compiled glob (None for bare rules)."""
+    tool, sep, rest = rule.partition("(")
+    if sep and rest.endswith(")"):
+        return tool, re.compile(fnmatch.translate(rest[:-1]))
+    return rule, None
 
 
 def get_tool_input_value(tool_name: str, tool_input: dict) -> str:
@@ -171,49 +271,201 @@ SENSITIVE_FILE_PATTERNS: list[str] = [
 ]
 
 
+_GLOB_CHARS = frozenset("*?[")
+
+
+def _split_sensitive_patterns(
+    patterns: list[str],
+) -> tuple[frozenset[str], tuple[str, ...], tuple[str, ...], re.Pattern[str] | None]:
+    """Lower globs to exact names, ``prefix*`` and ``*suffix`` checks.
+
+    Anything else (e.g. ``[...]`` classes or a ``*`` mid-pattern) is folded
+    into one fallback regex.
+    """
+    exact: set[str] = set()
+    prefixes: list[str] = []
+    suffixes: list[str] = []
+    other: list[str] = []
+    for pat in patterns:
+        if not _GLOB_CHARS.intersection(pat):
+            exact.add(pat)
+        elif pat.endswith("*") and not _GLOB_CHARS.intersection(pat[:-1]):
+            prefixes.append(pat[:-1])
+        elif pat.startswith("*") and not _GLOB_CHARS.intersection(pat[1:]):
+            suffixes.append(pat[1:])
+        else:
+            other.append(pat)
+    fallback = re.compile("|".join(fnmatch.translate(p) for p in other)) if other else None
+    return frozenset(exact), tuple(prefixes), tuple(suffixes), fallback
+
+
+_SENSITIVE_EXACT, _SENSITIVE_PREFIXES, _SENSITIVE_SUFFIXES, _SENSITIVE_RE = (
+    _split_sensitive_patterns(SENSITIVE_FILE_PATTERNS)
+)
+
+
 def is_sensitive_path(file_path: str) -> bool:
-    """Check if a file path matches any sensitive file pattern."""
+    """Check if a file path matches any sensitive file pattern.
+
+    Paths are POSIX tool inputs, so the basename is taken with a plain
+    ``rpartition("/")`` (same result as ``os.path.basename`` there).
+    """
     if not file_path:
         return False
-    basename = os.path.basename(file_path)
-    return any(fnmatch.fnmatch(basename, pat) for pat in SENSITIVE_FILE_PATTERNS)
+    return _is_sensitive_basename(file_path.rpartition("/")[2])
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_sensitive_basename(basename: str) -> bool:
+    return (
+        basename in _SENSITIVE_EXACT
+        or basename.startswith(_SENSITIVE_PREFIXES)
+        or basename.endswith(_SENSITIVE_SUFFIXES)
+        or (_SENSITIVE_RE is not None and _SENSITIVE_RE.match(basename) is not None)
+    )
 
 
 # --- Session-level permission cache ---
 
 # ask_once tools are always cached; Read is auto_allow but caches sensitive-file decisions.
-_SESSION_CACHEABLE_TOOLS: set[str] = {
-    tool for tool, policy in TOOL_POLICIES.items() if policy == ToolPolicy.ASK_ONCE
-} | {"Read"}
+# Keep in sync with TOOL_POLICIES (checked by the tests).
+_SESSION_CACHEABLE_TOOLS: frozenset[str] = frozenset({"Edit", "Read"})
 
 
 def _session_permissions_path(session_id: str) -> Path:
-    """Return path to session permission cache file."""
+    """Return path to the session permission cache snapshot."""
     return AFK_HOME / "sessions" / session_id / "permissions.json"
 
 
-def check_session_permission(
-    session_id: str, tool_name: str, tool_input: dict
-) -> Decision | None:
-    """Check session cache. Returns Decision.ALLOW, Decision.DENY, or None (not cached)."""
+def _session_log_path(session_id: str) -> Path:
+    """Return path to the session's append-only permission log (JSON Lines)."""
+    return AFK_HOME / "sessions" / session_id / "permissions.log"
+
+
+# New approvals are appended to permissions.log (one JSON object per line)
+# instead of rewriting permissions.json; the log is folded back into the
+# snapshot once it grows past this size.
+SESSION_LOG_COMPACT_BYTES = 16 * 1024
+
+# Parsed caches from this process, keyed by snapshot path and invalidated
+# by the stat signatures of the snapshot and log.  Each entry also holds the
+# allow and deny lists already indexed for matching.
+_session_memo: dict[str, tuple[tuple, dict, RuleIndex, RuleIndex]] = {}
+
+
+def _read_session_cache(session_id: str) -> dict | None:
+    """Return the session's merged snapshot + log, or None if nothing is cached.
+
+    The result has the snapshot layout: ``{"permissions": {"allow": [...],
+    "deny": [...]}, "bash_prefixes": [...]}``.  Callers must not mutate it.
+    """
+    memo = _load_session(session_id)
+    return memo[1] if memo is not None else None
+
+
+def _load_session(session_id: str) -> tuple[tuple, dict, RuleIndex, RuleIndex] | None:
+    """Return the session's memo entry (sig, data, allow index, deny index), or None."""
     path = _session_permissions_path(session_id)
-    if not path.exists():
+    log_path = _session_log_path(session_id)
+    sig = (_stat_signature(path), _stat_signature(log_path))
+    if sig == (None, None):
         return None
+    memo = _session_memo.get(str(path))
+    if memo is not None and memo[0] == sig:
+        return memo
+
+    # Unlocked: writers run under the per-session hook lock, and a read that
+    # straddles a compaction only misses entries, which callers treat as
+    # "not cached" and re-check under that lock.
+    try:
+        log_file = open(log_path, "rb")  # noqa: SIM115 — closed below
+    except OSError:
+        log_file = None
+    try:
+        data = _merge_session_cache(path, log_file)
+    finally:
+        if log_file is not None:
+            log_file.close()
+    perms = data["permissions"]
+    memo = (sig, data, index_rules(perms["allow"]), index_rules(perms["deny"]))
+    _session_memo[str(path)] = memo
+    return memo
+
+
+def _merge_session_cache(path: Path, log_file: BinaryIO | None) -> dict:
+    """Read the snapshot at *path* and replay *log_file* on top of it."""
+    allow: dict[str, None] = {}
+    deny: dict[str, None] = {}
+    prefixes: dict[str, None] = {}
+
     try:
-        with open(path) as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            snapshot = _json.loads(f.read())
     except (json.JSONDecodeError, OSError):
-        return None
+        snapshot = None
+    if isinstance(snapshot, dict):
+        perms = snapshot.get("permissions", {})
+        if isinstance(perms, dict):
+            allow.update(dict.fromkeys(perms.get("allow", [])))
+            deny.update(dict.fromkeys(perms.get("deny", [])))
+        prefixes.update(dict.fromkeys(snapshot.get("bash_prefixes", [])))
+
+    if log_file is not None:
+        for line in log_file:
+            try:
+                entry = _json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partially written trailing line
+            if not isinstance(entry, dict):
+                continue
+            rule = entry.get("rule")
+            if isinstance(rule, str):
+                if entry.get("decision") == Decision.ALLOW:
+                    allow[rule] = None
+                elif entry.get("decision") == Decision.DENY:
+                    deny[rule] = None
+            if isinstance(entry.get("bash_prefixes"), list):
+                prefixes.update(dict.fromkeys(entry["bash_prefixes"]))
+
+    return {
+        "permissions": {"allow": list(allow), "deny": list(deny)},
+        "bash_prefixes": list(prefixes),
+    }
+
+
+def _append_session_entry(session_id: str, entry: dict) -> None:
+    """Append one entry to the session log, compacting it when it gets large."""
+    log_path = _session_log_path(session_id)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "ab") as log_file:
+        fcntl.flock(log_file, fcntl.LOCK_EX)
+        log_file.write(_json.dumps(entry) + b"\n")
+        log_file.flush()
+        if log_file.tell() > SESSION_LOG_COMPACT_BYTES:
+            path = _session_permissions_path(session_id)
+            with open(log_path, "rb") as reader:
+                data = _merge_session_cache(path, reader)
+            # Machine-only file: written compact, read back with the fast decoder.
+            write_file(path, _json.dumps(data))
+            os.ftruncate(log_file.fileno(), 0)
+
+
+def check_session_permission(
+    session_id: str, tool_name: str, tool_input: dict, *, value: str | None = None
+) -> Decision | None:
+    """Check session cache. Returns Decision.ALLOW, Decision.DENY, or None (not cached).
 
-    perms = data.get("permissions", {})
+    *value* is passed through to :func:`tool_has_cc_rule`.
+    """
+    memo = _load_session(session_id)
+    if memo is None:
+        return None
+    _, _, allow_index, deny_index = memo
 
     # Check deny first — specific denials take precedence over broad allows
-    deny_rules = perms.get("deny", [])
-    if tool_has_cc_rule(tool_name, tool_input, deny_rules):
+    if tool_has_cc_rule(tool_name, tool_input, deny_index, value=value):
         return Decision.DENY
-
-    allow_rules = perms.get("allow", [])
-    if tool_has_cc_rule(tool_name, tool_input, allow_rules):
+    if tool_has_cc_rule(tool_name, tool_input, allow_index, value=value):
         return Decision.ALLOW
 
     return None
@@ -234,25 +486,7 @@ def build_session_rule(tool_name: str, tool_input: dict) -> str | None:
 
 def save_session_permission(session_id: str, rule: str, decision: Decision) -> None:
     """Append a rule to the session permission cache."""
-    path = _session_permissions_path(session_id)
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    data: dict = {"permissions": {"allow": [], "deny": []}}
-    if path.exists():
-        try:
-            with open(path) as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    perms = data.setdefault("permissions", {})
-    lst = perms.setdefault(decision, [])
-    if rule not in lst:
-        lst.append(rule)
-
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    _append_session_entry(session_id, {"decision": decision.value, "rule": rule})
 
 
 # ── Bash command prefix auto-approval ─────────────────────────────
@@ -269,39 +503,33 @@ def check_bash_prefixes(
     if not prefixes:
         return True, [], []
 
-    path = _session_permissions_path(session_id)
-    saved: list[str] = []
-    if path.exists():
-        try:
-            with open(path) as f:
-                data = json.load(f)
-            saved = data.get("bash_prefixes", [])
-        except (json.JSONDecodeError, OSError):
-            pass
+    data = _read_session_cache(session_id) or {}
+    saved: list[str] = data.get("bash_prefixes", [])
 
     approved = [p for p in prefixes if p in saved]
     unapproved = [p for p in prefixes if p not in saved]
     return len(unapproved) == 0, approved, unapproved
 
 
+def approved_bash_prefixes(session_id: str, command: str) -> list[str] | None:
+    """Return *command*'s prefixes if all are approved for this session, else None.
+
+    Stops parsing at the first unapproved prefix; use
+    :func:`check_bash_prefixes` when the unapproved ones are needed too.
+    """
+    data = _read_session_cache(session_id)
+    if data is None:
+        return None
+    saved = data.get("bash_prefixes", [])
+    approved: list[str] = []
+    for prefix in iter_command_prefixes(command):
+        if prefix not in saved:
+            return None
+        if prefix not in approved:
+            approved.append(prefix)
+    return approved or None
+
+
 def save_bash_prefixes(session_id: str, prefixes: list[str]) -> None:
     """Save approved Bash command prefixes to the session permission cache."""
-    path = _session_permissions_path(session_id)
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    data: dict = {"permissions": {"allow": [], "deny": []}}
-    if path.exists():
-        try:
-            with open(path) as f:
-                data = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    saved = data.setdefault("bash_prefixes", [])
-    for p in prefixes:
-        if p not in saved:
-            saved.append(p)
-
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
-        f.write("\n")
+    _append_session_entry(session_id, {"bash_prefixes": list(prefixes)})
@@ -7,40 +7,69 @@ for the bash auto-approval feature.
 from __future__ import annotations
 
 import re
+from collections.abc import Iterator
 
 # Commands where the first word is ambiguous — need 2-word prefix.
 # E.g. "git log --oneline" -> prefix "git log", not just "git".
-_TWO_WORD_PREFIX_COMMANDS: set[str] = {
-    "git",
-    "go",
-    "npm",
-    "npx",
-    "docker",
-    "uv",
-    "cargo",
-    "kubectl",
-    "pip",
-    "pip3",
-    "poetry",
-    "yarn",
-    "pnpm",
-    "brew",
-    "apt",
-    "make",
-    "dotnet",
-    "az",
-    "aws",
-    "gcloud",
-    "terraform",
-}
-
-# Pattern to match env var assignments at the start of a command.
-_ENV_VAR_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=\S*$")
+_TWO_WORD_PREFIX_COMMANDS: frozenset[str] = frozenset(
+    {
+        "git",
+        "go",
+        "npm",
+        "npx",
+        "docker",
+        "uv",
+        "cargo",
+        "kubectl",
+        "pip",
+        "pip3",
+        "poetry",
+        "yarn",
+        "pnpm",
+        "brew",
+        "apt",
+        "make",
+        "dotnet",
+        "az",
+        "aws",
+        "gcloud",
+        "terraform",
+    }
+)
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def _is_env_assignment(word: str) -> bool:
+    """True for a ``NAME=value`` word (NAME an ASCII identifier), as in ``VAR=1 cmd``."""
+    name, sep, _ = word.partition("=")
+    return bool(sep) and name.isascii() and name.isidentifier()
+
+
+# One token at a time for split_shell_commands.  Quoted and backtick runs are
+# single tokens, so delimiters inside them are never seen.  An unterminated
+# quote runs to the end of the string.
+_QUOTED = r"""'[^']*'?|"(?:\\.|[^"\\])*"?|`(?:\\.|[^`\\])*`?"""
+# Top level: backslash escapes, delimiters, and openers are their own tokens.
+_TOP_TOKEN_RE = re.compile(_QUOTED + r"""|\\.|\|\||&&|[|;]|[({]|[^'"`\\|&;({]+|.""", re.DOTALL)
+# Inside ( ) / { }: only quotes and brackets matter; backslashes are literal.
+_NESTED_TOKEN_RE = re.compile(_QUOTED + r"""|[({]|[)}]|[^'"`(){}]+""", re.DOTALL)
+_DELIMITERS = ("||", "&&", "|", ";")
+_OPENERS = ("(", "{")
+_CLOSERS = (")", "}")
 
 
 def split_shell_commands(command: str) -> list[str]:
     """Split a shell command on ``|``, ``&&``, ``||``, ``;`` respecting quoting.
 
+    See :func:`iter_shell_commands` for the quoting rules.
+    """
+    return list(iter_shell_commands(command))
+
+
+def iter_shell_commands(command: str) -> Iterator[str]:
+    """Yield the non-blank sub-commands of *command* as they are found.
+
     The following constructs suppress delimiter recognition:
 
     * Single quotes (``'...'``) — everything literal, no escaping
@@ -50,110 +79,31 @@ def split_shell_commands(command: str) -> list[str]:
       substitution ``<(…)`` / ``>(…)``)
     * Backslash escape outside quotes (``\\|``, ``\\;`` etc.)
     """
-    parts: list[str] = []
-    current: list[str] = []
-    i = 0
+    start = 0  # start of the current sub-command
+    pos = 0
     n = len(command)
-    in_single = False
-    in_double = False
-    in_backtick = False
     depth = 0  # nesting depth for () and {}
 
-    while i < n:
-        c = command[i]
-
-        # ── Inside single quotes: everything literal until closing ' ──
-        if in_single:
-            current.append(c)
-            if c == "'":
-                in_single = False
-            i += 1
-            continue
-
-        # ── Inside backticks: everything literal until closing ` ──
-        if in_backtick:
-            current.append(c)
-            if c == "\\" and i + 1 < n:
-                current.append(command[i + 1])
-                i += 2
-                continue
-            if c == "`":
-                in_backtick = False
-            i += 1
-            continue
-
-        # ── Inside double quotes ──
-        if in_double:
-            current.append(c)
-            if c == "\\" and i + 1 < n:
-                current.append(command[i + 1])
-                i += 2
-                continue
-            if c == '"':
-                in_double = False
-            i += 1
-            continue
-
-        # ── Inside grouping (parens/braces) ──
-        if depth > 0:
-            current.append(c)
-            if c == "'":
-                in_single = True
-            elif c == '"':
-                in_double = True
-            elif c == "`":
-                in_backtick = True
-            elif c in ("(", "{"):
+    while pos < n:
+        m = (_NESTED_TOKEN_RE if depth else _TOP_TOKEN_RE).match(command, pos)
+        tok = m.group()
+        if depth:
+            if tok in _OPENERS:
                 depth += 1
-            elif c in (")", "}"):
+            elif tok in _CLOSERS:
                 depth -= 1
-            i += 1
-            continue
-
-        # ── Top-level parsing ──
+        elif tok in _DELIMITERS:
+            part = command[start : m.start()]
+            if part.strip():
+                yield part
+            start = m.end()
+        elif tok in _OPENERS:
+            depth = 1
+        pos = m.end()
 
-        # Backslash escape: next char is literal
-        if c == "\\" and i + 1 < n:
-            current.append(c)
-            current.append(command[i + 1])
-            i += 2
-            continue
-
-        if c == "'":
-            in_single = True
-            current.append(c)
-        elif c == '"':
-            in_double = True
-            current.append(c)
-        elif c == "`":
-            in_backtick = True
-            current.append(c)
-        elif c in ("(", "{"):
-            depth += 1
-            current.append(c)
-        elif c == "|" and i + 1 < n and command[i + 1] == "|":
-            parts.append("".join(current))
-            current = []
-            i += 1
-        elif c == "|":
-            parts.append("".join(current))
-            current = []
-        elif c == "&" and i + 1 < n and command[i + 1] == "&":
-            parts.append("".join(current))
-            current = []
-            i += 1
-        elif c == ";":
-            parts.append("".join(current))
-            current = []
-        else:
-            current.append(c)
-
-        i += 1
-
-    if current:
-        parts.append("".join(current))
-
-    return [p for p in parts if p.strip()]
+    part = command[start:]
+    if part.strip():
+        yield part
 
 
 def extract_command_prefixes(command: str) -> list[str]:
@@ -170,29 +120,37 @@ def extract_command_prefixes(command: str) -> list[str]:
         "VAR=1 docker compose up"      -> ["docker compose"]
         'grep -E "(a|b|c)" file'       -> ["grep"]
     """
-    if not command or not command.strip():
-        return []
-
-    sub_commands = split_shell_commands(command)
     seen: set[str] = set()
     prefixes: list[str] = []
-
-    for sub in sub_commands:
-        tokens = sub.strip().split()
-        # Skip env var assignments (VAR=val)
-        while tokens and _ENV_VAR_RE.match(tokens[0]):
-            tokens = tokens[1:]
-        if not tokens:
-            continue
-
-        base = tokens[0]
-        if base in _TWO_WORD_PREFIX_COMMANDS and len(tokens) > 1:
-            prefix = f"{base} {tokens[1]}"
-        else:
-            prefix = base
-
+    for prefix in iter_command_prefixes(command):
         if prefix not in seen:
             seen.add(prefix)
             prefixes.append(prefix)
-
     return prefixes
+
+
+def iter_command_prefixes(command: str) -> Iterator[str]:
+    """Yield the prefix of each sub-command in order (repeats included).
+
+    Lazy, so a caller that only needs the first unapproved prefix stops
+    parsing there.
+    """
+    for sub in iter_shell_commands(command):
+        # Only the first one or two words after any env assignments matter,
+        # so words are pulled lazily rather than splitting the whole command.
+        words = _WORD_RE.finditer(sub)
+        base = None
+        for m in words:
+            # Skip env var assignments (VAR=val)
+            if not _is_env_assignment(m.group()):
+                base = m.group()
+                break
+        if base is None:
+            continue
+
+        if base in _TWO_WORD_PREFIX_COMMANDS:
+            second = next(words, None)
+            if second is not None:
+                yield f"{base} {second.group()}"
+                continue
+        yield base
@@ -13,17 +13,28 @@ from __future__ import annotations
 
 import contextlib
 import fcntl
+import hashlib
+import json
 import logging
+import random
 import threading
 import time
+from typing import TYPE_CHECKING
 
-from slack_sdk import WebClient
+from slack_sdk.errors import SlackApiError
 from slack_sdk.socket_mode import SocketModeClient
 from slack_sdk.socket_mode.request import SocketModeRequest
 from slack_sdk.socket_mode.response import SocketModeResponse
 
+from claude_afk import _json
 from claude_afk.config import MAX_SLACK_TEXT, SlackConfig
 from claude_afk.slack import thread as thread_state
+from claude_afk.slack.client import get_web_client
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from slack_sdk import WebClient
 
 log = logging.getLogger("claude-afk.slack.bridge")
 
@@ -35,12 +46,70 @@ _REACTION_ALWAYS_ALLOW = {
     "black_right_pointing_double_triangle_with_vertical_bar",
 }
 
+# Events API event types _handle_event acts on; everything else is acked and dropped.
+_HANDLED_EVENT_TYPES = frozenset({"message", "reaction_added"})
+
 # Sentinel values returned by wait_for_reply() for reactions.
 # Distinct from any text a user could type.
 REPLY_ALLOW = "__REACTION_ALLOW__"
 REPLY_DENY = "__REACTION_DENY__"
 REPLY_ALWAYS_ALLOW = "__REACTION_ALWAYS_ALLOW__"
 
+# Reaction name -> sentinel, built once so classifying is a single lookup.
+_REACTION_REPLIES: dict[str, str] = {
+    **dict.fromkeys(_REACTION_ALLOW, REPLY_ALLOW),
+    **dict.fromkeys(_REACTION_DENY, REPLY_DENY),
+    **dict.fromkeys(_REACTION_ALWAYS_ALLOW, REPLY_ALWAYS_ALLOW),
+}
+
+
+def _classify_reaction(name: str) -> str | None:
+    """Map a reaction name to a REPLY_* sentinel, or None if it means nothing.
+
+    Skin-tone variants (``+1::skin-tone-3``) count as the base reaction.
+    """
+    return _REACTION_REPLIES.get(name.partition("::")[0])
+
+
+def _bot_user_cache_path() -> Path:
+    from claude_afk.config import AFK_HOME
+
+    return AFK_HOME / "cache" / "bot_users.json"
+
+
+def _resolve_bot_user_id(web_client: WebClient, token: str) -> str | None:
+    """Return the bot's user ID, calling auth.test only on a cache miss.
+
+    The ID never changes for a given token, so it is cached on disk keyed
+    by a hash of the token (the token itself is never written).
+    """
+    from claude_afk.config import write_file
+
+    key = hashlib.sha256(token.encode()).hexdigest()[:16]
+    path = _bot_user_cache_path()
+    try:
+        with open(path, "rb") as f:
+            cache = _json.loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    if isinstance(cache.get(key), str):
+        return cache[key]
+
+    auth = web_client.auth_test()
+    if not auth.get("ok"):
+        return None
+    user_id = auth.get("user_id")
+    if user_id:
+        cache[key] = user_id
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_file(path, _json.dumps(cache), mode=0o600)
+        except OSError:
+            pass  # cache is best-effort
+    return user_id
+
 
 class SlackBridge:
     """Context manager for bidirectional Slack communication via DM.
@@ -54,19 +123,24 @@ class SlackBridge:
             reply = bridge.wait_for_reply()
     """
 
-    _POLL_INTERVAL = 3  # seconds between polling attempts
+    # Poll-mode backoff: the delay between polls starts at _POLL_MIN seconds
+    # and doubles while nothing arrives, up to config.poll_interval (each sleep gets
+    # +/-20% jitter so parallel poll-mode bridges drift apart).
+    _POLL_MIN = 0.5
+    _POLL_MULT = 2.0
 
     def __init__(self, config: SlackConfig, session_id: str) -> None:
         self._config = config
         self._session_id = session_id
 
-        self._web_client = WebClient(token=config.bot_token)
+        self._web_client = get_web_client(config.bot_token)
         self._sm_client: SocketModeClient | None = None
         self._bot_user_id: str | None = None
 
         # Thread state — loaded from disk so we continue in the same Slack thread
         state = thread_state.load(session_id)
         self.thread_ts: str | None = state.get("thread_ts")
+        self._saved_thread_ts = self.thread_ts  # last thread_ts written to disk
         self._needs_header = not self.thread_ts
 
         # Reply synchronization (socket mode)
@@ -77,16 +151,15 @@ class SlackBridge:
         # Connection mode: "socket" (holds global lock) or "poll" (fallback)
         self._mode: str = "socket"
         self._lock_fd = None
+        self._retry_after: float | None = None  # set when a poll is rate-limited
 
     def __enter__(self) -> SlackBridge:
         from claude_afk.config import BRIDGE_LOCK_PATH, ensure_home
 
         ensure_home()
 
-        auth = self._web_client.auth_test()
-        if auth.get("ok"):
-            self._bot_user_id = auth.get("user_id")
-            log.debug("authenticated as bot user %s", self._bot_user_id)
+        self._bot_user_id = _resolve_bot_user_id(self._web_client, self._config.bot_token)
+        log.debug("bot user %s", self._bot_user_id)
 
         # Try to acquire the global Socket Mode lock (non-blocking).
         # Only one bridge at a time should use Socket Mode.
@@ -162,9 +235,16 @@ class SlackBridge:
             log.debug("new thread started ts=%s", self.thread_ts)
 
         self._last_post_ts = resp.get("ts")
-        thread_state.save(self._session_id, self.thread_ts)
+        self._save_thread()
         return True
 
+    def _save_thread(self) -> None:
+        """Persist thread_ts, skipping the write if it is already on disk."""
+        if self.thread_ts == self._saved_thread_ts:
+            return
+        thread_state.save(self._session_id, self.thread_ts)
+        self._saved_thread_ts = self.thread_ts
+
     def _post_as_snippet(self, text: str) -> bool:
         """Upload long content as a text snippet, then post the action hint.
 
@@ -191,7 +271,7 @@ class SlackBridge:
                 log.warning("chat_postMessage (thread init) failed: %s", resp.get("error"))
                 return False
             self.thread_ts = resp.get("ts")
-            thread_state.save(self._session_id, self.thread_ts)
+            self._save_thread()
             log.debug("new thread started ts=%s", self.thread_ts)
 
         # Upload the body as a text snippet in the thread
@@ -250,7 +330,7 @@ class SlackBridge:
         if not self.thread_ts:
             self.thread_ts = resp.get("ts")
         self._last_post_ts = resp.get("ts")
-        thread_state.save(self._session_id, self.thread_ts)
+        self._save_thread()
         return True
 
     def wait_for_reply(self) -> str | None:
@@ -295,6 +375,9 @@ class SlackBridge:
 
         event = req.payload.get("event", {})
         event_type = event.get("type")
+        if event_type not in _HANDLED_EVENT_TYPES:
+            sm_client.send_socket_mode_response(SocketModeResponse(envelope_id=req.envelope_id))
+            return
 
         is_thread_reply = (
             event_type == "message"
@@ -327,12 +410,8 @@ class SlackBridge:
         """Process a validated thread reply."""
         if event.get("channel") != self._config.dm_channel_id:
             return
-        if event.get("bot_id"):
-            return
-        if self._bot_user_id and event.get("user") == self._bot_user_id:
-            return
-        if self._config.user_id and event.get("user") != self._config.user_id:
-            log.debug("ignoring reply from non-verified user %s", event.get("user"))
+        if not self._is_user_message(event):
+            log.debug("ignoring reply from bot or non-verified user %s", event.get("user"))
             return
 
         # Ignore stale messages sent before the bot's latest post
@@ -346,6 +425,16 @@ class SlackBridge:
         self._reply_text = event.get("text", "")
         self._reply_event.set()
 
+    def _is_user_message(self, msg: dict) -> bool:
+        """True if *msg* was sent by the verified user rather than a bot.
+
+        Shared by the Socket Mode and poll paths so both apply the same filter.
+        """
+        user = msg.get("user")
+        if msg.get("bot_id") or (self._bot_user_id and user == self._bot_user_id):
+            return False
+        return not self._config.user_id or user == self._config.user_id
+
     def _handle_reaction(self, event: dict) -> None:
         """Process an emoji reaction on our last posted message."""
         item = event.get("item", {})
@@ -361,17 +450,10 @@ class SlackBridge:
             return
 
         reaction = event.get("reaction", "")
-        if reaction in _REACTION_ALLOW:
-            log.debug("reaction %s -> allow", reaction)
-            self._reply_text = REPLY_ALLOW
-            self._reply_event.set()
-        elif reaction in _REACTION_DENY:
-            log.debug("reaction %s -> deny", reaction)
-            self._reply_text = REPLY_DENY
-            self._reply_event.set()
-        elif reaction in _REACTION_ALWAYS_ALLOW:
-            log.debug("reaction %s -> always_allow", reaction)
-            self._reply_text = REPLY_ALWAYS_ALLOW
+        reply = _classify_reaction(reaction)
+        if reply is not None:
+            log.debug("reaction %s -> %s", reaction, reply)
+            self._reply_text = reply
             self._reply_event.set()
 
     # -- Poll-based waiting (fallback when SM lock is held) --
@@ -384,28 +466,43 @@ class SlackBridge:
             self.thread_ts,
         )
         deadline = time.monotonic() + self._config.timeout
+        # Never poll faster than _POLL_MIN, whatever config.json says.
+        max_interval = max(self._POLL_MIN, self._config.poll_interval)
+        interval = self._POLL_MIN
 
         while time.monotonic() < deadline:
+            self._retry_after = None
             reply = self._poll_thread_replies()
             if reply is not None:
                 log.debug("poll: received reply: %r", reply[:100])
                 return reply
 
-            reaction = self._poll_reactions()
-            if reaction is not None:
-                log.debug("poll: received reaction: %r", reaction)
-                return reaction
-
             remaining = deadline - time.monotonic()
             if remaining <= 0:
                 break
-            time.sleep(min(self._POLL_INTERVAL, remaining))
+            if self._retry_after is not None:
+                delay = self._retry_after
+                log.debug("poll: rate limited, waiting %.1fs", delay)
+            else:
+                delay = interval * random.uniform(0.8, 1.2)
+                interval = min(max_interval, interval * self._POLL_MULT)
+            time.sleep(min(delay, remaining))
 
         log.debug("poll: reply timed out after %ss", self._config.timeout)
         return None
 
+    def _note_rate_limit(self, exc: Exception) -> None:
+        """Remember Slack's Retry-After if *exc* is a rate-limit error."""
+        if isinstance(exc, SlackApiError) and exc.response.get("error") == "ratelimited":
+            retry_after = float(exc.response.headers.get("Retry-After", 1))
+            self._retry_after = max(retry_after, self._retry_after or 0.0)
+
     def _poll_thread_replies(self) -> str | None:
-        """Poll conversations.replies for new thread messages."""
+        """Poll conversations.replies for new thread messages and reactions.
+
+        Reactions on our last post come embedded in the same response, so one
+        request per tick covers both. A text reply wins over a reaction.
+        """
         if not self.thread_ts:
             return None
         try:
@@ -413,60 +510,39 @@ class SlackBridge:
                 channel=self._config.dm_channel_id,
                 ts=self.thread_ts,
                 oldest=self._last_post_ts or self.thread_ts,
+                inclusive=True,
                 limit=10,
             )
-        except Exception:
+        except Exception as e:
+            self._note_rate_limit(e)
             log.debug("poll: conversations.replies failed", exc_info=True)
             return None
 
         if not resp.get("ok"):
             return None
 
+        reaction_reply = None
         for msg in resp.get("messages", []):
-            if msg.get("subtype"):
-                continue
-            if msg.get("bot_id"):
-                continue
-            if self._bot_user_id and msg.get("user") == self._bot_user_id:
+            msg_ts = msg.get("ts", "")
+            if self._last_post_ts and msg_ts == self._last_post_ts:
+                if reaction_reply is None:
+                    reaction_reply = self._reaction_reply(msg)
                 continue
-            if self._config.user_id and msg.get("user") != self._config.user_id:
+            if msg.get("subtype") or not self._is_user_message(msg):
                 continue
-            msg_ts = msg.get("ts", "")
             if self._last_post_ts and msg_ts <= self._last_post_ts:
                 continue
             return msg.get("text", "")
 
-        return None
+        return reaction_reply
 
-    def _poll_reactions(self) -> str | None:
-        """Poll reactions.get for emoji reactions on our last posted message."""
-        if not self._last_post_ts:
-            return None
-        try:
-            resp = self._web_client.reactions_get(
-                channel=self._config.dm_channel_id,
-                timestamp=self._last_post_ts,
-            )
-        except Exception:
-            log.debug("poll: reactions.get failed", exc_info=True)
-            return None
-
-        if not resp.get("ok"):
-            return None
-
-        message = resp.get("message", {})
-        for reaction_obj in message.get("reactions", []):
-            name = reaction_obj.get("name", "")
+    def _reaction_reply(self, msg: dict) -> str | None:
+        """Map the user's emoji reactions on *msg* to a reply sentinel."""
+        for reaction_obj in msg.get("reactions", []):
             users = reaction_obj.get("users", [])
-
             if self._config.user_id and self._config.user_id not in users:
                 continue
-
-            if name in _REACTION_ALLOW:
-                return REPLY_ALLOW
-            if name in _REACTION_DENY:
-                return REPLY_DENY
-            if name in _REACTION_ALWAYS_ALLOW:
-                return REPLY_ALWAYS_ALLOW
-
+            reply = _classify_reaction(reaction_obj.get("name", ""))
+            if reply is not None:
+                return reply
         return None
@@ -0,0 +1,22 @@
+"""Shared Slack Web API client.
+
+One ``WebClient`` per bot token per process, so the bridge, the notify hook
+and the CLI don't each rebuild one, and every call gets an explicit HTTP
+timeout instead of slack_sdk's 30s default.
+
+Importing this module loads slack_sdk; hooks import it lazily.
+"""
+
+from __future__ import annotations
+
+import functools
+
+from slack_sdk import WebClient
+
+HTTP_TIMEOUT = 10  # seconds per Web API call
+
+
+@functools.lru_cache(maxsize=4)
+def get_web_client(token: str) -> WebClient:
+    """Return the process-wide ``WebClient`` for *token*."""
+    return WebClient(token=token, timeout=HTTP_TIMEOUT)
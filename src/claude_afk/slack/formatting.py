@@ -8,36 +8,52 @@ from __future__ import annotations
 
 import json
 import re
+from collections.abc import Callable
 
 from claude_afk.config import MAX_SLACK_TEXT
 
-# Markdown → Slack mrkdwn conversion patterns
+# Task-list checkbox ([ ] / [x]) → glyph shown after the bullet.
+_CHECKBOXES = {" ": "☐ ", "x": "☑ ", "X": "☑ "}
+
+
+def _list_item(match: re.Match) -> str:
+    indent, checkbox, rest = match.groups()
+    return f"{indent}• {_CHECKBOXES.get(checkbox, '')}{rest}"
+
+
+# Markdown → Slack mrkdwn conversion patterns, applied in order.
 # Adapted from https://github.com/fla9ua/markdown_to_mrkdwn
-_MRKDWN_PATTERNS: list[tuple[re.Pattern, str]] = [
-    # Task lists
-    (re.compile(r"^(\s*)- \[([ ])\] (.+)", re.MULTILINE), r"\1• ☐ \3"),
-    (re.compile(r"^(\s*)- \[([xX])\] (.+)", re.MULTILINE), r"\1• ☑ \3"),
-    # Unordered lists
-    (re.compile(r"^(\s*)- (.+)", re.MULTILINE), r"\1• \2"),
+# Each entry starts with a substring every match must contain; a pass whose
+# marker is absent from the text can't match and is skipped.
+_MRKDWN_PATTERNS: list[tuple[str, re.Pattern, str | Callable[[re.Match], str]]] = [
+    # Unordered lists and task lists (- [ ] / - [x]) in one pass
+    ("- ", re.compile(r"^(\s*)- (?:\[([ xX])\] )?(.+)", re.MULTILINE), _list_item),
     # Images
-    (re.compile(r"!\[.*?\]\((.+?)\)", re.MULTILINE), r"<\1>"),
+    ("![", re.compile(r"!\[.*?\]\((.+?)\)", re.MULTILINE), r"<\1>"),
     # Bold+italic (***text***) — must come before bold/italic
-    (re.compile(r"(?<!\*)\*\*\*([^*\n]+?)\*\*\*(?!\*)", re.MULTILINE), r"*_\1_*"),
+    ("***", re.compile(r"(?<!\*)\*\*\*([^*\n]+?)\*\*\*(?!\*)", re.MULTILINE), r"*_\1_*"),
     # Italic (*text*) — must come BEFORE bold so *text* → _text_ first
-    (re.compile(r"(?<!\*)\*([^*\n]+?)\*(?!\*)", re.MULTILINE), r"_\1_"),
+    ("*", re.compile(r"(?<!\*)\*([^*\n]+?)\*(?!\*)", re.MULTILINE), r"_\1_"),
     # Bold (**text** or __text__) — after italic, so **text** still intact
-    (re.compile(r"(?<!\*)\*\*(.+?)\*\*(?!\*)", re.MULTILINE), r"*\1*"),
-    (re.compile(r"__(.+?)__", re.MULTILINE), r"*\1*"),
+    ("**", re.compile(r"(?<!\*)\*\*(.+?)\*\*(?!\*)", re.MULTILINE), r"*\1*"),
+    ("__", re.compile(r"__(.+?)__", re.MULTILINE), r"*\1*"),
     # Headers → bold
-    (re.compile(r"^#{1,6} (.+?)\s*$", re.MULTILINE), r"*\1*"),
+    ("# ", re.compile(r"^#{1,6} (.+?)\s*$", re.MULTILINE), r"*\1*"),
     # Links
-    (re.compile(r"\[(.+?)\]\((.+?)\)", re.MULTILINE), r"<\2|\1>"),
+    ("](", re.compile(r"\[(.+?)\]\((.+?)\)", re.MULTILINE), r"<\2|\1>"),
     # Strikethrough
-    (re.compile(r"~~(.+?)~~", re.MULTILINE), r"~\1~"),
-    # Horizontal rules
-    (re.compile(r"^(---|\*\*\*|___)$", re.MULTILINE), r"──────────"),
+    ("~~", re.compile(r"~~(.+?)~~", re.MULTILINE), r"~\1~"),
+    # Horizontal rules (three different markers, so always run)
+    ("", re.compile(r"^(---|\*\*\*|___)$", re.MULTILINE), r"──────────"),
 ]
 
+# Every conversion above (and the table pass) needs one of these characters;
+# text without any of them comes back unchanged.
+_MD_SIGIL_RE = re.compile(r"[-*_#\[!~|]")
+
+# Fenced code blocks; the capture group keeps them in re.split() output.
+_FENCE_RE = re.compile(r"(```[\s\S]*?```)")
+
 _TABLE_PATTERN = re.compile(
     r"^\|(.+)\|\s*$\n^\|[-:| ]+\|\s*$(\n^\|.+\|\s*$)*",
     re.MULTILINE,
@@ -89,15 +105,19 @@ def _convert_tables(text: str) -> str:
 
 def md_to_mrkdwn(text: str) -> str:
     """Convert Markdown to Slack mrkdwn format, preserving code blocks."""
-    parts = re.split(r"(```[\s\S]*?```)", text)
+    if not _MD_SIGIL_RE.search(text):
+        return text
+    parts = _FENCE_RE.split(text)
     result = []
     for i, part in enumerate(parts):
         if i % 2 == 1:
             result.append(part)
         else:
-            part = _convert_tables(part)
-            for pattern, replacement in _MRKDWN_PATTERNS:
-                part = pattern.sub(replacement, part)
+            if "|" in part:
+                part = _convert_tables(part)
+            for marker, pattern, replacement in _MRKDWN_PATTERNS:
+                if marker in part:
+                    part = pattern.sub(replacement, part)
             result.append(part)
     return "".join(result)
 
@@ -158,7 +178,7 @@ def format_tool_permission(
     return text
 
 
-def format_single_question(q: dict, question_num: int, total: int) -> str:
+def format_single_question(q: dict, question_num: int, total: int, *, hint: bool = True) -> str:
     """Format a single AskUserQuestion for Slack."""
     question_text = q.get("question", "")
     header = q.get("header", "")
@@ -185,14 +205,27 @@ def format_single_question(q: dict, question_num: int, total: int) -> str:
             line += f" — {desc}"
         parts.append(line)
 
-    if multi:
+    if hint and multi:
         parts.append("\n_Reply with one or more numbers (e.g. `1,3`) or your own text_")
-    else:
+    elif hint:
         parts.append("\n_Reply with a number or your own answer_")
 
     return "\n".join(parts)
 
 
+def format_questions(questions: list[dict]) -> str:
+    """Format every question of an AskUserQuestion call as one Slack message."""
+    total = len(questions)
+    if total == 1:
+        return format_single_question(questions[0], 1, 1)
+    sections = [format_single_question(q, i, total, hint=False) for i, q in enumerate(questions, 1)]
+    return (
+        "\n\n".join(sections)
+        + "\n\n_Reply with one answer per line, in order (a number, `1,3`, or your own text)."
+        + " Prefix a line with `2:` to answer a specific question._"
+    )
+
+
 def format_plan_approval(plan: str, allowed_prompts: list[dict] | None = None) -> str:
     """Format a plan approval prompt for Slack.
 
@@ -9,7 +9,8 @@ from __future__ import annotations
 
 import json
 
-from claude_afk.config import AFK_HOME, ensure_home
+from claude_afk import _json
+from claude_afk.config import AFK_HOME, ensure_home, write_file
 
 
 def _threads_dir():
@@ -22,18 +23,20 @@ def get_state_path(session_id: str) -> str:
 
 def load(session_id: str) -> dict:
     path = _threads_dir() / f"{session_id}.json"
-    if path.exists():
-        try:
-            with open(path) as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+    try:
+        with open(path, "rb") as f:
+            return _json.loads(f.read())
+    except (json.JSONDecodeError, OSError):
+        return {}
 
 
 def save(session_id: str, thread_ts: str) -> None:
-    ensure_home()
-    _threads_dir().mkdir(parents=True, exist_ok=True)
     path = _threads_dir() / f"{session_id}.json"
-    with open(path, "w") as f:
-        json.dump({"thread_ts": thread_ts}, f)
+    data = _json.dumps({"thread_ts": thread_ts})
+    try:
+        write_file(path, data)
+    except FileNotFoundError:
+        # First save on this machine: create the directory tree, then retry.
+        ensure_home()
+        _threads_dir().mkdir(parents=True, exist_ok=True)
+        write_file(path, data)
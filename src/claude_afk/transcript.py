@@ -4,57 +4,148 @@ from __future__ import annotations
 
 import json
 import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from claude_afk import _json
+
+# Block size for scanning the transcript backwards from the end.
+_TAIL_BLOCK = 64 * 1024
+
+# An entry of a given type must contain its quoted type name, so lines without
+# it are skipped before JSON decoding (tool results make up most of the file).
+_USER_MARK = b'"user"'
+_ASSISTANT_MARK = b'"assistant"'
+
+
+@dataclass(frozen=True)
+class StopContext:
+    """What the Stop hook needs from a transcript."""
+
+    last_assistant_message: str = ""
+    session_name: str = ""
+
+
+def _parse_line(line: bytes) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = _json.loads(line)
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _iter_lines_reversed(f: BinaryIO) -> Iterator[bytes]:
+    """Yield the lines of *f* last-first, reading fixed-size blocks from the end.
+
+    Blocks without a newline are kept as pending chunks and joined once the
+    start of their line is found, so a very long line is copied only once.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    pending: list[bytes] = []  # pieces of the current line, last piece first
+    while pos > 0:
+        step = min(_TAIL_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        block = f.read(step)
+        if b"\n" not in block:
+            pending.append(block)
+            continue
+        lines = block.split(b"\n")
+        pending.append(lines[-1])
+        lines[-1] = b"".join(reversed(pending))
+        pending = [lines[0]]
+        yield from reversed(lines[1:])
+    yield b"".join(reversed(pending))
+
+
+def _session_name_from(f: BinaryIO) -> str:
+    f.seek(0)
+    for line in f:
+        if _USER_MARK not in line:
+            continue
+        entry = _parse_line(line)
+        if entry is None or entry.get("type") != "user":
+            continue
+        content = entry.get("message", {}).get("content", "")
+        if isinstance(content, str):
+            return content.strip()[:80]
+        if isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and block.get("type") == "text":
+                    return block.get("text", "").strip()[:80]
+        return ""
+    return ""
+
+
+def _last_assistant_message_from(f: BinaryIO) -> str:
+    for line in _iter_lines_reversed(f):
+        if _ASSISTANT_MARK not in line:
+            continue
+        entry = _parse_line(line)
+        if entry is None or entry.get("type") != "assistant":
+            continue
+        content = entry.get("message", {}).get("content", [])
+        texts = [
+            b.get("text", "") for b in content if isinstance(b, dict) and b.get("type") == "text"
+        ]
+        result = "\n".join(texts).strip()
+        if result:
+            return result
+    return ""
+
+
+def _open(transcript_path: str) -> BinaryIO | None:
+    if not transcript_path:
+        return None
+    try:
+        return open(transcript_path, "rb")
+    except OSError:
+        return None
+
+
+def get_stop_context(transcript_path: str) -> StopContext:
+    """Read the session name and the last assistant message with one open.
+
+    The name comes from the first user message (read from the start) and
+    the reply from the end of the file, read backwards, so the middle of a
+    long transcript is never parsed.
+    """
+    f = _open(transcript_path)
+    if f is None:
+        return StopContext()
+    try:
+        with f:
+            return StopContext(
+                last_assistant_message=_last_assistant_message_from(f),
+                session_name=_session_name_from(f),
+            )
+    except OSError:
+        return StopContext()
 
 
 def get_session_name(transcript_path: str) -> str:
     """Extract a session name from the first user message in the transcript."""
-    if not transcript_path or not os.path.exists(transcript_path):
+    f = _open(transcript_path)
+    if f is None:
         return ""
     try:
-        with open(transcript_path) as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except (json.JSONDecodeError, ValueError):
-                    continue
-                if entry.get("type") == "user":
-                    content = entry.get("message", {}).get("content", "")
-                    if isinstance(content, str):
-                        return content.strip()[:80]
-                    if isinstance(content, list):
-                        for block in content:
-                            if isinstance(block, dict) and block.get("type") == "text":
-                                return block.get("text", "").strip()[:80]
-                    return ""
+        with f:
+            return _session_name_from(f)
     except OSError:
-        pass
-    return ""
+        return ""
 
 
 def get_last_assistant_message(transcript_path: str) -> str:
     """Parse JSONL transcript and extract the last assistant message text."""
-    if not transcript_path or not os.path.exists(transcript_path):
+    f = _open(transcript_path)
+    if f is None:
         return ""
     try:
-        with open(transcript_path) as f:
-            lines = f.readlines()
+        with f:
+            return _last_assistant_message_from(f)
     except OSError:
         return ""
-    for line in reversed(lines):
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            entry = json.loads(line)
-        except (json.JSONDecodeError, ValueError):
-            continue
-        if entry.get("type") == "assistant":
-            content = entry.get("message", {}).get("content", [])
-            texts = [b.get("text", "") for b in content if b.get("type") == "text"]
-            result = "\n".join(texts).strip()
-            if result:
-                return result
-    return ""
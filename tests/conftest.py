@@ -4,8 +4,19 @@ from __future__ import annotations
 
 import pytest
 
-from claude_afk import cli, config
+from claude_afk import cli, config, permissions
 from claude_afk.config import SlackConfig
+from claude_afk.slack import bridge
+
+
+@pytest.fixture(autouse=True)
+def _isolated_rules_cache(tmp_path, monkeypatch):
+    """Keep the rule and bot-user caches out of the real ~/.claude-afk."""
+    cache_path = tmp_path / "cache" / "cc_rules.json"
+    monkeypatch.setattr(permissions, "_rules_cache_path", lambda: cache_path)
+    monkeypatch.setattr(permissions, "_rules_memo", {})
+    bot_cache_path = tmp_path / "cache" / "bot_users.json"
+    monkeypatch.setattr(bridge, "_bot_user_cache_path", lambda: bot_cache_path)
 
 
 @pytest.fixture()
@@ -13,6 +24,7 @@ def afk_home(tmp_path, monkeypatch):
     """Point AFK_HOME to a temp directory and create the directory structure."""
     monkeypatch.setattr(config, "AFK_HOME", tmp_path)
     monkeypatch.setattr(cli, "AFK_HOME", tmp_path)
+    config._clear_caches()
     config.ensure_home()
     return tmp_path
 
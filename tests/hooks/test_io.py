@@ -0,0 +1,33 @@
+"""Tests for hooks.read_input / write_output — stdin/stdout JSON."""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from claude_afk.hooks import read_input, write_output
+from claude_afk.permissions import Decision
+
+
+def _stdin(monkeypatch, payload: bytes) -> None:
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8"))
+
+
+def test_read_input_parses_payload(monkeypatch):
+    _stdin(monkeypatch, '{"session_id": "s1", "tool_input": {"x": "é"}}'.encode())
+    assert read_input() == {"session_id": "s1", "tool_input": {"x": "é"}}
+
+
+@pytest.mark.parametrize("payload", [b"", b"  \n", b"{not json", b"[1, 2]"])
+def test_read_input_falls_back_to_empty(monkeypatch, payload):
+    _stdin(monkeypatch, payload)
+    assert read_input() == {}
+
+
+def test_write_output_single_utf8_line(capsysbinary):
+    write_output({"decision": Decision.ALLOW, "reason": "ok ✓"})
+    out = capsysbinary.readouterr().out
+    assert out.endswith(b"\n") and out.count(b"\n") == 1
+    assert json.loads(out) == {"decision": "allow", "reason": "ok ✓"}
@@ -24,11 +24,11 @@ def test_format_notification():
     assert "attention" in result
 
 
-@patch("claude_afk.hooks.notify.WebClient")
-def test_run_stop_success(mock_wc_cls):
+@patch("claude_afk.slack.client.get_web_client")
+def test_run_stop_success(mock_get_client):
     mock_client = MagicMock()
     mock_client.chat_postMessage.return_value = {"ok": True}
-    mock_wc_cls.return_value = mock_client
+    mock_get_client.return_value = mock_client
 
     cfg = SlackConfig(
         bot_token="xoxb-x", socket_mode_token="xapp-x", user_id="U1", dm_channel_id="D1"
@@ -54,3 +54,51 @@ def test_run_unknown_event():
     )
     result = run({}, cfg, "unknown_event")
     assert result is False
+
+
+def _ratelimited(retry_after: str = "30"):
+    from slack_sdk.errors import SlackApiError
+
+    response = MagicMock()
+    response.get.side_effect = {"error": "ratelimited"}.get
+    response.headers = {"Retry-After": retry_after}
+    return SlackApiError("ratelimited", response)
+
+
+_NOTIFY_CFG = SlackConfig(
+    bot_token="xoxb-x", socket_mode_token="xapp-x", user_id="U1", dm_channel_id="D1"
+)
+
+
+@patch("claude_afk.hooks.notify.time.sleep")
+@patch("claude_afk.slack.client.get_web_client")
+def test_run_retries_once_when_ratelimited(mock_get_client, mock_sleep):
+    mock_client = MagicMock()
+    mock_client.chat_postMessage.side_effect = [_ratelimited(), {"ok": True}]
+    mock_get_client.return_value = mock_client
+
+    assert run({"cwd": "/tmp/proj"}, _NOTIFY_CFG, "stop") is True
+    assert mock_client.chat_postMessage.call_count == 2
+    # Retry-After of 30s is capped
+    assert mock_sleep.call_args[0][0] <= 2.25
+
+
+@patch("claude_afk.hooks.notify.time.sleep")
+@patch("claude_afk.slack.client.get_web_client")
+def test_run_gives_up_after_second_ratelimit(mock_get_client, mock_sleep):
+    mock_client = MagicMock()
+    mock_client.chat_postMessage.side_effect = [_ratelimited(), _ratelimited()]
+    mock_get_client.return_value = mock_client
+
+    assert run({"cwd": "/tmp/proj"}, _NOTIFY_CFG, "stop") is False
+    assert mock_client.chat_postMessage.call_count == 2
+
+
+@patch("claude_afk.slack.client.get_web_client")
+def test_run_does_not_retry_other_errors(mock_get_client):
+    mock_client = MagicMock()
+    mock_client.chat_postMessage.side_effect = RuntimeError("boom")
+    mock_get_client.return_value = mock_client
+
+    assert run({"cwd": "/tmp/proj"}, _NOTIFY_CFG, "stop") is False
+    assert mock_client.chat_postMessage.call_count == 1
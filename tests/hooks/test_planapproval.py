@@ -40,7 +40,7 @@ def test_run_approve_via_reaction(capsys, monkeypatch):
     bridge.wait_for_reply.return_value = REPLY_ALLOW
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
@@ -61,7 +61,7 @@ def test_run_deny_via_reaction(capsys, monkeypatch):
     bridge.wait_for_reply.return_value = REPLY_DENY
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
@@ -83,7 +83,7 @@ def test_run_feedback_as_deny(capsys, monkeypatch):
     bridge.wait_for_reply.return_value = "please add error handling to step 3"
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
@@ -105,7 +105,7 @@ def test_run_timeout_auto_approves(capsys, monkeypatch):
     bridge.wait_for_reply.return_value = None
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
@@ -136,7 +136,7 @@ def test_run_post_failure_auto_approves(capsys, monkeypatch):
     bridge.post.return_value = False
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
@@ -157,7 +157,7 @@ def test_run_with_allowed_prompts(capsys, monkeypatch):
     bridge.wait_for_reply.return_value = REPLY_ALLOW
 
     monkeypatch.setattr(
-        "claude_afk.hooks.planapproval.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(
             __enter__=lambda s: bridge, __exit__=lambda *a: None
         ),
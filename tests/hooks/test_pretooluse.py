@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import json
+import os
+import subprocess
+import sys
 from unittest.mock import MagicMock
 
 from claude_afk.hooks.pretooluse import (
     _emit,
     _handle_ask_user_question,
     _handle_permission,
+    _session_lock,
+    _session_lock_path,
     resolve_question_answer,
     run,
 )
@@ -163,8 +168,7 @@ def test_handle_permission_no_cache_for_bash(capsys, tmp_path, monkeypatch):
     capsys.readouterr()
 
     # Session dir should not even exist for Bash
-    path = tmp_path / "sessions" / "sess-cache" / "permissions.json"
-    assert not path.exists()
+    assert not (tmp_path / "sessions" / "sess-cache").exists()
 
 
 # --- _handle_ask_user_question ---
@@ -187,6 +191,88 @@ def test_handle_ask_user_question(capsys):
     output = json.loads(capsys.readouterr().out.strip())
     assert output["hookSpecificOutput"]["permissionDecision"] == "deny"
     assert "Opt A" in output["hookSpecificOutput"]["permissionDecisionReason"]
+    assert bridge.post.call_args_list[-1][0][0] == "*Choice:* Opt A"
+
+
+def _two_questions():
+    return [
+        {
+            "question": "Pick one?",
+            "header": "Choice",
+            "options": [{"label": "Opt A"}, {"label": "Opt B"}],
+            "multiSelect": False,
+        },
+        {
+            "question": "Which db?",
+            "header": "DB",
+            "options": [{"label": "Postgres"}, {"label": "SQLite"}],
+            "multiSelect": False,
+        },
+    ]
+
+
+def test_handle_ask_user_question_batches_posts(capsys):
+    bridge = MagicMock()
+    bridge.post.return_value = True
+    bridge.wait_for_reply.return_value = "2\n1"
+
+    _handle_ask_user_question(bridge, _two_questions())
+    output = json.loads(capsys.readouterr().out.strip())
+    reason = output["hookSpecificOutput"]["permissionDecisionReason"]
+    assert "Choice: Opt B; DB: Postgres" in reason
+
+    # 1 combined question message + 1 confirmation
+    assert bridge.post.call_count == 2
+    first_post = bridge.post.call_args_list[0][0][0]
+    assert "Pick one?" in first_post and "Which db?" in first_post
+    confirm = bridge.post.call_args_list[1][0][0]
+    assert confirm.endswith("*Choice:* Opt B\n*DB:* Postgres")
+
+
+def test_handle_ask_user_question_answers_across_replies(capsys):
+    bridge = MagicMock()
+    bridge.post.return_value = True
+    bridge.wait_for_reply.side_effect = ["2: SQLite please", "1"]
+
+    _handle_ask_user_question(bridge, _two_questions())
+    output = json.loads(capsys.readouterr().out.strip())
+    reason = output["hookSpecificOutput"]["permissionDecisionReason"]
+    assert "Choice: Opt A; DB: SQLite please" in reason
+
+
+def _three_questions():
+    return [
+        *_two_questions(),
+        {
+            "question": "Deploy now?",
+            "header": "Deploy",
+            "options": [{"label": "Yes"}, {"label": "No"}],
+            "multiSelect": False,
+        },
+    ]
+
+
+def test_handle_ask_user_question_multiline_free_text_answers_one(capsys):
+    bridge = MagicMock()
+    bridge.post.return_value = True
+    bridge.wait_for_reply.side_effect = ["Opt A, because\nit is simpler", "2\n1"]
+
+    _handle_ask_user_question(bridge, _three_questions())
+    output = json.loads(capsys.readouterr().out.strip())
+    reason = output["hookSpecificOutput"]["permissionDecisionReason"]
+    assert "Choice: Opt A, because\nit is simpler; DB: SQLite; Deploy: Yes" in reason
+    assert bridge.wait_for_reply.call_count == 2
+
+
+def test_handle_ask_user_question_numbered_lines_spread(capsys):
+    bridge = MagicMock()
+    bridge.post.return_value = True
+    bridge.wait_for_reply.side_effect = ["3: 2\n1: 1", "Postgres"]
+
+    _handle_ask_user_question(bridge, _three_questions())
+    output = json.loads(capsys.readouterr().out.strip())
+    reason = output["hookSpecificOutput"]["permissionDecisionReason"]
+    assert "Choice: Opt A; DB: Postgres; Deploy: No" in reason
 
 
 # --- run() auto-allow policies ---
@@ -241,7 +327,7 @@ def test_run_prompts_for_sensitive_read(capsys, monkeypatch, tmp_path):
     bridge.wait_for_reply.return_value = REPLY_ALLOW
 
     monkeypatch.setattr(
-        "claude_afk.hooks.pretooluse.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(__enter__=lambda s: bridge, __exit__=lambda *a: None),
     )
 
@@ -278,8 +364,7 @@ def test_handle_permission_always_allow_saves_prefixes(capsys, tmp_path, monkeyp
     assert "Always-allowed" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
     # Verify prefixes were saved
-    path = tmp_path / "sessions" / "sess-aa" / "permissions.json"
-    data = json.loads(path.read_text())
+    data = perms._read_session_cache("sess-aa")
     assert "git log" in data["bash_prefixes"]
     assert "head" in data["bash_prefixes"]
 
@@ -305,8 +390,7 @@ def test_handle_permission_thumbsup_does_not_save_prefixes(capsys, tmp_path, mon
     assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
 
     # No bash_prefixes should be saved for thumbsup
-    path = tmp_path / "sessions" / "sess-no-save" / "permissions.json"
-    assert not path.exists()
+    assert perms._read_session_cache("sess-no-save") is None
 
 
 # --- run() bash prefix auto-approval ---
@@ -322,12 +406,30 @@ def test_run_auto_allows_when_all_prefixes_approved(capsys, monkeypatch, tmp_pat
     perms.save_bash_prefixes("sess-prefix", ["git log", "head"])
 
     data = _make_data("Bash", {"command": "git log --oneline | head -20"}, "sess-prefix")
+    import claude_afk.hooks.pretooluse as pretooluse
+
+    monkeypatch.setattr(pretooluse.fcntl, "flock", MagicMock(side_effect=AssertionError))
     run(data, _mock_config())
     output = json.loads(capsys.readouterr().out.strip())
     assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
     assert "all prefixes approved" in output["hookSpecificOutput"]["permissionDecisionReason"]
 
 
+def test_run_session_cache_hit_skips_lock(capsys, monkeypatch, tmp_path):
+    import claude_afk.hooks.pretooluse as pretooluse
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+    monkeypatch.setattr("claude_afk.hooks.pretooluse.load_cc_permission_rules", lambda cwd: [])
+    perms.save_session_permission("sess-hit", "Edit(/tmp/foo.py)", perms.Decision.ALLOW)
+    monkeypatch.setattr(pretooluse.fcntl, "flock", MagicMock(side_effect=AssertionError))
+
+    run(_make_data("Edit", {"file_path": "/tmp/foo.py"}, "sess-hit"), _mock_config())
+    output = json.loads(capsys.readouterr().out.strip())
+    assert output["hookSpecificOutput"]["permissionDecision"] == "allow"
+    assert "session cache" in output["hookSpecificOutput"]["permissionDecisionReason"]
+
+
 def test_run_prompts_with_unapproved_prefixes(capsys, monkeypatch, tmp_path):
     import claude_afk.permissions as perms
 
@@ -342,7 +444,7 @@ def test_run_prompts_with_unapproved_prefixes(capsys, monkeypatch, tmp_path):
     bridge.wait_for_reply.return_value = REPLY_ALLOW
 
     monkeypatch.setattr(
-        "claude_afk.hooks.pretooluse.SlackBridge",
+        "claude_afk.slack.bridge.SlackBridge",
         lambda config, sid: MagicMock(__enter__=lambda s: bridge, __exit__=lambda *a: None),
     )
 
@@ -444,3 +546,42 @@ def test_handle_ask_user_question_stops_if_reminder_fails(capsys):
     ]
     _handle_ask_user_question(bridge, questions)
     assert capsys.readouterr().out.strip() == ""
+
+
+def test_hook_modules_do_not_import_slack_sdk():
+    """Early-exit paths must not pay for importing slack_sdk."""
+    code = (
+        "import sys\n"
+        "import claude_afk.hooks.notify, claude_afk.hooks.planapproval\n"
+        "import claude_afk.hooks.pretooluse, claude_afk.hooks.stop\n"
+        "sys.exit('slack_sdk' in sys.modules)\n"
+    )
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
+
+
+def test_session_lock_does_not_truncate(monkeypatch):
+    import claude_afk.hooks.pretooluse as pretooluse
+
+    opened = []
+    real_open = pretooluse.os.open
+
+    def spy_open(path, flags, mode=0o777):
+        opened.append(flags)
+        return real_open(path, flags, mode)
+
+    monkeypatch.setattr(pretooluse.os, "open", spy_open)
+    with _session_lock("sess-lock-test"):
+        pass
+    assert opened and not opened[0] & os.O_TRUNC
+    assert opened[0] & os.O_CLOEXEC
+
+
+def test_session_lock_path_prefers_runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert _session_lock_path("s1") == str(tmp_path / "claude_afk_s1.lock")
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "missing"))
+    assert _session_lock_path("s1") == "/tmp/claude_afk_s1.lock"
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert _session_lock_path("s1") == "/tmp/claude_afk_s1.lock"
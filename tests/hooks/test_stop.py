@@ -7,15 +7,13 @@ from unittest.mock import MagicMock, patch
 
 from claude_afk.config import SlackConfig
 from claude_afk.hooks.stop import run
+from claude_afk.transcript import StopContext
 
 
 @patch("claude_afk.hooks.stop.time.sleep")
-@patch("claude_afk.hooks.stop.SlackBridge")
-@patch("claude_afk.hooks.stop.get_last_assistant_message", return_value="Done!")
-@patch("claude_afk.hooks.stop.get_session_name", return_value="Fix bug")
-def test_run_posts_and_blocks_on_reply(
-    mock_name, mock_msg, mock_bridge_cls, mock_sleep, capsys
-):
+@patch("claude_afk.slack.bridge.SlackBridge")
+@patch("claude_afk.transcript.get_stop_context", return_value=StopContext("Done!", "Fix bug"))
+def test_run_posts_and_blocks_on_reply(mock_ctx, mock_bridge_cls, mock_sleep, capsys):
     bridge = MagicMock()
     bridge.thread_ts = None
     bridge.post.return_value = True
@@ -35,10 +33,9 @@ def test_run_posts_and_blocks_on_reply(
 
 
 @patch("claude_afk.hooks.stop.time.sleep")
-@patch("claude_afk.hooks.stop.SlackBridge")
-@patch("claude_afk.hooks.stop.get_last_assistant_message", return_value="Done!")
-@patch("claude_afk.hooks.stop.get_session_name", return_value="")
-def test_run_timeout_no_output(mock_name, mock_msg, mock_bridge_cls, mock_sleep, capsys):
+@patch("claude_afk.slack.bridge.SlackBridge")
+@patch("claude_afk.transcript.get_stop_context", return_value=StopContext("Done!", ""))
+def test_run_timeout_no_output(mock_ctx, mock_bridge_cls, mock_sleep, capsys):
     bridge = MagicMock()
     bridge.thread_ts = "existing-ts"
     bridge.post.return_value = True
@@ -54,3 +51,35 @@ def test_run_timeout_no_output(mock_name, mock_msg, mock_bridge_cls, mock_sleep,
 
     captured = capsys.readouterr().out.strip()
     assert captured == ""
+
+
+@patch("claude_afk.slack.bridge.SlackBridge")
+@patch("claude_afk.transcript.get_stop_context", return_value=StopContext("Done!", ""))
+def test_run_reads_transcript_while_bridge_connects(mock_ctx, mock_bridge_cls, monkeypatch):
+    import threading
+
+    import claude_afk.hooks.stop as stop
+
+    entered = threading.Event()
+    # The flush delay only returns once the bridge has started connecting.
+    monkeypatch.setattr(stop.time, "sleep", lambda s: entered.wait(5))
+
+    bridge = MagicMock()
+    bridge.thread_ts = "ts"
+    bridge.wait_for_reply.return_value = None
+
+    def enter(*args):
+        entered.set()
+        return bridge
+
+    mock_bridge_cls.return_value.__enter__ = MagicMock(side_effect=enter)
+    mock_bridge_cls.return_value.__exit__ = MagicMock(return_value=False)
+
+    cfg = SlackConfig(
+        bot_token="xoxb-x", socket_mode_token="xapp-x", user_id="U1", dm_channel_id="D1"
+    )
+    run({"session_id": "sess-par", "cwd": "/tmp/proj", "transcript_path": "/t"}, cfg)
+
+    assert entered.is_set()
+    bridge.post.assert_called_once()
+    assert "Done!" in bridge.post.call_args.args[0]
@@ -88,6 +88,20 @@ def test_handle_event_rejects_wrong_thread():
     sm_client.send_socket_mode_response.assert_not_called()
 
 
+def test_handle_event_acks_unhandled_event_type():
+    bridge = _make_bridge(_CFG)
+    bridge._handle_thread_reply = MagicMock()
+    bridge._handle_reaction = MagicMock()
+
+    req = _make_request({"type": "app_home_opened", "user": "U123"})
+    sm_client = MagicMock()
+
+    bridge._handle_event(sm_client, req)
+    sm_client.send_socket_mode_response.assert_called_once()
+    bridge._handle_thread_reply.assert_not_called()
+    bridge._handle_reaction.assert_not_called()
+
+
 def test_handle_event_rejects_bot():
     bridge = _make_bridge(_CFG)
 
@@ -127,6 +141,20 @@ def test_handle_reaction_thumbsup_allows():
     assert bridge._reply_event.is_set()
 
 
+def test_handle_reaction_skin_tone_variant_allows():
+    bridge = _make_bridge(_CFG)
+    bridge._last_post_ts = "msg-ts-001"
+
+    event = {
+        "type": "reaction_added",
+        "user": "U123",
+        "reaction": "+1::skin-tone-4",
+        "item": {"type": "message", "channel": "D456", "ts": "msg-ts-001"},
+    }
+    bridge._handle_event(MagicMock(), _make_request(event))
+    assert bridge._reply_text == REPLY_ALLOW
+
+
 def test_handle_reaction_thumbsdown_denies():
     bridge = _make_bridge(_CFG)
     bridge._last_post_ts = "msg-ts-001"
@@ -215,6 +243,23 @@ def test_post_creates_thread(mock_thread_state):
     assert bridge.thread_ts == "new-ts-123"
     mock_thread_state.save.assert_called_once_with("test-sess", "new-ts-123")
 
+    bridge._web_client.chat_postMessage.return_value = {"ok": True, "ts": "reply-ts"}
+    assert bridge.post("Again")
+    mock_thread_state.save.assert_called_once()
+
+
+@patch("claude_afk.slack.bridge.thread_state")
+def test_post_saves_thread_only_when_it_changes(mock_thread_state):
+    mock_thread_state.load.return_value = {"thread_ts": "existing-ts"}
+
+    bridge = SlackBridge(_CFG, "test-sess")
+    bridge._web_client = MagicMock()
+    bridge._web_client.chat_postMessage.return_value = {"ok": True, "ts": "reply-ts"}
+
+    assert bridge.post("one")
+    assert bridge.post("two")
+    mock_thread_state.save.assert_not_called()
+
 
 def test_post_short_message_no_snippet():
     """Messages under MAX_SLACK_TEXT go through chat_postMessage directly."""
@@ -304,6 +349,33 @@ def test_enter_acquires_lock_socket_mode(mock_sm_cls, mock_thread_state, tmp_pat
         bridge.__exit__(None, None, None)
 
 
+def test_resolve_bot_user_id_cached_per_token():
+    from claude_afk.slack.bridge import _bot_user_cache_path, _resolve_bot_user_id
+
+    client = MagicMock()
+    client.auth_test.return_value = {"ok": True, "user_id": "BBOT"}
+
+    assert _resolve_bot_user_id(client, "xoxb-a") == "BBOT"
+    assert _resolve_bot_user_id(client, "xoxb-a") == "BBOT"
+    client.auth_test.assert_called_once()
+    assert b"xoxb-a" not in _bot_user_cache_path().read_bytes()
+
+    client.auth_test.return_value = {"ok": True, "user_id": "BOTHER"}
+    assert _resolve_bot_user_id(client, "xoxb-b") == "BOTHER"
+    assert client.auth_test.call_count == 2
+
+
+def test_resolve_bot_user_id_failed_auth_not_cached():
+    from claude_afk.slack.bridge import _resolve_bot_user_id
+
+    client = MagicMock()
+    client.auth_test.return_value = {"ok": False, "error": "invalid_auth"}
+
+    assert _resolve_bot_user_id(client, "xoxb-a") is None
+    assert _resolve_bot_user_id(client, "xoxb-a") is None
+    assert client.auth_test.call_count == 2
+
+
 @patch("claude_afk.slack.bridge.thread_state")
 def test_enter_falls_back_to_poll_mode(mock_thread_state, tmp_path, monkeypatch):
     """When SM lock is held by another process, bridge falls back to poll mode."""
@@ -335,6 +407,16 @@ def test_enter_falls_back_to_poll_mode(mock_thread_state, tmp_path, monkeypatch)
         held_fd.close()
 
 
+def test_is_user_message_filters_bots_and_other_users():
+    bridge = _make_bridge(_CFG)
+    bridge._bot_user_id = "BBOT"
+
+    assert bridge._is_user_message({"user": "U123"})
+    assert not bridge._is_user_message({"user": "BBOT"})
+    assert not bridge._is_user_message({"user": "U123", "bot_id": "B1"})
+    assert not bridge._is_user_message({"user": "U999"})
+
+
 # --- Poll-based reply methods ---
 
 
@@ -401,95 +483,143 @@ def test_poll_thread_replies_handles_api_error():
     assert result is None
 
 
-def test_poll_reactions_finds_allow():
+def test_poll_thread_replies_reaction_finds_allow():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.return_value = {
+    bridge._web_client.conversations_replies.return_value = {
         "ok": True,
-        "message": {
-            "reactions": [
-                {"name": "+1", "users": ["U123"], "count": 1},
-            ],
-        },
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [
+                    {"name": "+1", "users": ["U123"], "count": 1},
+                ],
+            },
+        ],
     }
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result == REPLY_ALLOW
 
 
-def test_poll_reactions_finds_deny():
+def test_poll_thread_replies_reaction_finds_deny():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.return_value = {
+    bridge._web_client.conversations_replies.return_value = {
         "ok": True,
-        "message": {
-            "reactions": [
-                {"name": "thumbsdown", "users": ["U123"], "count": 1},
-            ],
-        },
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [
+                    {"name": "thumbsdown", "users": ["U123"], "count": 1},
+                ],
+            },
+        ],
     }
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result == REPLY_DENY
 
 
-def test_poll_reactions_ignores_wrong_user():
+def test_poll_thread_replies_reaction_ignores_wrong_user():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.return_value = {
+    bridge._web_client.conversations_replies.return_value = {
         "ok": True,
-        "message": {
-            "reactions": [
-                {"name": "+1", "users": ["U999"], "count": 1},
-            ],
-        },
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [
+                    {"name": "+1", "users": ["U999"], "count": 1},
+                ],
+            },
+        ],
     }
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result is None
 
 
-def test_poll_reactions_ignores_unknown_emoji():
+def test_poll_thread_replies_reaction_ignores_unknown_emoji():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.return_value = {
+    bridge._web_client.conversations_replies.return_value = {
         "ok": True,
-        "message": {
-            "reactions": [
-                {"name": "eyes", "users": ["U123"], "count": 1},
-            ],
-        },
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [
+                    {"name": "eyes", "users": ["U123"], "count": 1},
+                ],
+            },
+        ],
     }
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result is None
 
 
-def test_poll_reactions_handles_api_error():
+def test_poll_thread_replies_reaction_handles_api_error():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.side_effect = Exception("rate limited")
+    bridge._web_client.conversations_replies.side_effect = Exception("rate limited")
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result is None
 
 
-def test_poll_reactions_no_last_post():
+def test_poll_thread_replies_no_thread():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = None
+    bridge.thread_ts = None
+    bridge._web_client = MagicMock()
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result is None
+    bridge._web_client.conversations_replies.assert_not_called()
+
+
+def test_poll_thread_replies_text_wins_over_reaction():
+    """One conversations.replies call covers both; a typed reply takes precedence."""
+    bridge = _make_bridge(_CFG)
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
+
+    bridge._web_client = MagicMock()
+    bridge._web_client.conversations_replies.return_value = {
+        "ok": True,
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [{"name": "+1", "users": ["U123"], "count": 1}],
+            },
+            {"user": "U123", "ts": "1235.0001", "text": "wait, not yet"},
+        ],
+    }
+
+    assert bridge._poll_thread_replies() == "wait, not yet"
+    bridge._web_client.conversations_replies.assert_called_once()
+    assert bridge._web_client.conversations_replies.call_args.kwargs["inclusive"] is True
+    bridge._web_client.reactions_get.assert_not_called()
 
 
 def test_wait_for_reply_poll_timeout():
@@ -507,7 +637,6 @@ def test_wait_for_reply_poll_timeout():
 
     bridge._web_client = MagicMock()
     bridge._web_client.conversations_replies.return_value = {"ok": True, "messages": []}
-    bridge._web_client.reactions_get.return_value = {"ok": True, "message": {"reactions": []}}
 
     result = bridge.wait_for_reply()
     assert result is None
@@ -538,6 +667,119 @@ def test_wait_for_reply_poll_finds_reply():
     assert result == "looks good"
 
 
+def test_wait_for_reply_poll_backs_off(monkeypatch):
+    """Idle polls back off exponentially (with jitter) up to the cap."""
+    import claude_afk.slack.bridge as bridge_mod
+
+    cfg = SlackConfig(
+        bot_token="xoxb-x",
+        socket_mode_token="xapp-x",
+        user_id="U123",
+        dm_channel_id="D456",
+        timeout=100,
+    )
+    bridge = _make_bridge(cfg)
+    bridge._mode = "poll"
+    bridge._last_post_ts = "msg-ts-001"
+    bridge._web_client = MagicMock()
+    bridge._web_client.conversations_replies.return_value = {"ok": True, "messages": []}
+
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(bridge_mod.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(bridge_mod.time, "sleep", fake_sleep)
+    monkeypatch.setattr(bridge_mod.random, "uniform", lambda a, b: 1.0)
+
+    assert bridge.wait_for_reply() is None
+    assert sleeps[:6] == [0.5, 1.0, 2.0, 4.0, 8.0, 10.0]
+    assert max(sleeps) == 10.0
+
+
+def _poll_sleeps(monkeypatch, poll_interval: float, timeout: int = 10) -> list[float]:
+    """Run an idle poll-mode wait on a fake clock and return the sleeps taken."""
+    import claude_afk.slack.bridge as bridge_mod
+
+    cfg = SlackConfig(
+        bot_token="xoxb-x",
+        socket_mode_token="xapp-x",
+        user_id="U123",
+        dm_channel_id="D456",
+        timeout=timeout,
+        poll_interval=poll_interval,
+    )
+    bridge = _make_bridge(cfg)
+    bridge._mode = "poll"
+    bridge._last_post_ts = "msg-ts-001"
+    bridge._web_client = MagicMock()
+    bridge._web_client.conversations_replies.return_value = {"ok": True, "messages": []}
+
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(bridge_mod.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(bridge_mod.time, "sleep", fake_sleep)
+    monkeypatch.setattr(bridge_mod.random, "uniform", lambda a, b: 1.0)
+
+    assert bridge.wait_for_reply() is None
+    return sleeps
+
+
+def test_wait_for_reply_poll_respects_configured_cap(monkeypatch):
+    """poll_interval caps the backoff."""
+    sleeps = _poll_sleeps(monkeypatch, poll_interval=2.0)
+    assert sleeps[:4] == [0.5, 1.0, 2.0, 2.0]
+    assert sum(sleeps) == 10.0
+
+
+def test_wait_for_reply_poll_clamps_non_positive_interval(monkeypatch):
+    """A zero or negative poll_interval never polls faster than _POLL_MIN."""
+    for bad in (0.0, -5.0):
+        sleeps = _poll_sleeps(monkeypatch, poll_interval=bad, timeout=5)
+        assert min(sleeps) > 0
+        assert set(sleeps) == {SlackBridge._POLL_MIN}
+
+
+def test_wait_for_reply_poll_honors_retry_after(monkeypatch):
+    from slack_sdk.errors import SlackApiError
+
+    import claude_afk.slack.bridge as bridge_mod
+
+    cfg = SlackConfig(
+        bot_token="xoxb-x",
+        socket_mode_token="xapp-x",
+        user_id="U123",
+        dm_channel_id="D456",
+        timeout=100,
+    )
+    bridge = _make_bridge(cfg)
+    bridge._mode = "poll"
+    bridge._last_post_ts = "1234.9999"
+
+    limited = MagicMock()
+    limited.get.return_value = "ratelimited"
+    limited.headers = {"Retry-After": "7"}
+    bridge._web_client = MagicMock()
+    bridge._web_client.conversations_replies.side_effect = [
+        SlackApiError("ratelimited", limited),
+        {"ok": True, "messages": [{"user": "U123", "ts": "1235.0001", "text": "go"}]},
+    ]
+
+    sleeps: list[float] = []
+    monkeypatch.setattr(bridge_mod.time, "sleep", sleeps.append)
+
+    assert bridge.wait_for_reply() == "go"
+    assert sleeps == [7.0]
+
+
 # --- Always-allow reaction (fast_forward) ---
 
 
@@ -559,19 +801,24 @@ def test_handle_reaction_fast_forward_always_allows():
     assert bridge._reply_event.is_set()
 
 
-def test_poll_reactions_finds_always_allow():
+def test_poll_thread_replies_reaction_finds_always_allow():
     bridge = _make_bridge(_CFG)
-    bridge._last_post_ts = "msg-ts-001"
+    bridge.thread_ts = "1234.0001"
+    bridge._last_post_ts = "1234.9999"
 
     bridge._web_client = MagicMock()
-    bridge._web_client.reactions_get.return_value = {
+    bridge._web_client.conversations_replies.return_value = {
         "ok": True,
-        "message": {
-            "reactions": [
-                {"name": "fast_forward", "users": ["U123"], "count": 1},
-            ],
-        },
+        "messages": [
+            {
+                "user": "BBOT",
+                "ts": "1234.9999",
+                "reactions": [
+                    {"name": "fast_forward", "users": ["U123"], "count": 1},
+                ],
+            },
+        ],
     }
 
-    result = bridge._poll_reactions()
+    result = bridge._poll_thread_replies()
     assert result == REPLY_ALWAYS_ALLOW
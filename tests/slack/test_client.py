@@ -0,0 +1,15 @@
+"""Tests for slack.client — shared WebClient per token."""
+
+from __future__ import annotations
+
+from claude_afk.slack.client import HTTP_TIMEOUT, get_web_client
+
+
+def test_get_web_client_reused_per_token():
+    a = get_web_client("xoxb-one")
+    assert get_web_client("xoxb-one") is a
+    assert get_web_client("xoxb-two") is not a
+
+
+def test_get_web_client_sets_timeout():
+    assert get_web_client("xoxb-timeout").timeout == HTTP_TIMEOUT
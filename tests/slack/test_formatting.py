@@ -7,6 +7,7 @@ from claude_afk.slack.formatting import (
     TIMEOUT_REMINDER,
     format_bash_prefix_hint,
     format_plan_approval,
+    format_questions,
     format_single_question,
     format_tool_permission,
     md_to_mrkdwn,
@@ -60,6 +61,20 @@ def test_md_to_mrkdwn_tables():
     assert "Alice" in result
 
 
+def test_md_to_mrkdwn_lists_and_task_lists():
+    text = "- [ ] todo\n  - [x] done\n- [X] also\n- plain"
+    assert md_to_mrkdwn(text) == "• ☐ todo\n  • ☑ done\n• ☑ also\n• plain"
+
+
+def test_md_to_mrkdwn_mixed_markup_in_one_line():
+    text = "- **bold** and *it* ~~gone~~ [l](http://x)"
+    assert md_to_mrkdwn(text) == "• *bold* and _it_ ~gone~ <http://x|l>"
+
+
+def test_md_to_mrkdwn_plain_text_unchanged():
+    assert md_to_mrkdwn("nothing to convert here") == "nothing to convert here"
+
+
 # --- format_tool_permission ---
 
 
@@ -234,3 +249,20 @@ def test_timeout_reminder_has_action_hints():
 def test_question_timeout_reminder_has_action_hints():
     assert "Still waiting" in QUESTION_TIMEOUT_REMINDER
     assert "answer" in QUESTION_TIMEOUT_REMINDER
+
+
+def test_format_questions_single_matches_single_question():
+    q = {"question": "Which option?", "options": [{"label": "A"}]}
+    assert format_questions([q]) == format_single_question(q, 1, 1)
+
+
+def test_format_questions_batches_with_one_hint():
+    qs = [
+        {"question": "First?", "options": [{"label": "A"}]},
+        {"question": "Second?", "options": [{"label": "B"}], "multiSelect": True},
+    ]
+    result = format_questions(qs)
+    assert "Question 1/2" in result and "Question 2/2" in result
+    assert "one answer per line" in result
+    assert "Reply with a number or your own answer" not in result
+    assert "one or more numbers" not in result
@@ -19,3 +19,28 @@ def test_get_state_path(afk_home):
     path = thread.get_state_path("my-session")
     assert path.endswith("my-session.json")
     assert "threads" in path
+
+
+def test_save_replaces_file_atomically(afk_home, monkeypatch):
+    monkeypatch.setattr(thread, "AFK_HOME", afk_home)
+    thread.save("sess-123", "1.000001")
+    thread.save("sess-123", "2.000002")
+    threads = afk_home / "slack" / "threads"
+    assert [p.name for p in threads.iterdir()] == ["sess-123.json"]
+    assert thread.load("sess-123") == {"thread_ts": "2.000002"}
+
+
+def test_load_corrupt_returns_empty(afk_home, monkeypatch):
+    monkeypatch.setattr(thread, "AFK_HOME", afk_home)
+    (afk_home / "slack" / "threads" / "bad.json").write_bytes(b"{not json")
+    assert thread.load("bad") == {}
+
+
+def test_save_creates_missing_directories(tmp_path, monkeypatch):
+    from claude_afk import config
+
+    home = tmp_path / "fresh-home"
+    monkeypatch.setattr(config, "AFK_HOME", home)
+    monkeypatch.setattr(thread, "AFK_HOME", home)
+    thread.save("sess-1", "1.000001")
+    assert thread.load("sess-1") == {"thread_ts": "1.000001"}
@@ -5,6 +5,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pytest
 from click.testing import CliRunner
 
 from claude_afk.cli import _install_hooks, _uninstall_hooks, main
@@ -33,7 +34,7 @@ def test_enable_all(afk_home, sample_config):
     result = runner.invoke(main, ["enable", "all"])
     assert result.exit_code == 0
     state = load_state()
-    assert state["enabled"] == "all"
+    assert state["mode"] == "all"
     assert str(afk_home) in result.output
 
 
@@ -58,18 +59,19 @@ def test_enable_session(afk_home, sample_config, tmp_path):
     result = runner.invoke(main, ["enable", "sess-42"])
     assert result.exit_code == 0
     state = load_state()
-    assert "sess-42" in state["enabled"]
+    assert "sess-42" in state["sessions"]
     assert str(afk_home) in result.output
 
 
 def test_disable_all(afk_home, sample_config):
     sample_config.save()
-    save_state({"enabled": "all"})
+    save_state({"mode": "all"})
     runner = CliRunner()
     result = runner.invoke(main, ["disable", "all"])
     assert result.exit_code == 0
     state = load_state()
-    assert state["enabled"] == []
+    assert state["mode"] == "explicit"
+    assert state["sessions"] == []
     assert str(afk_home) in result.output
 
 
@@ -88,13 +90,13 @@ def test_disable_session(afk_home, sample_config, tmp_path):
         claude_homes=[str(claude_home)],
     )
     cfg.save()
-    save_state({"enabled": ["sess-1", "sess-2"]})
+    save_state({"mode": "explicit", "sessions": ["sess-1", "sess-2"]})
     runner = CliRunner()
     result = runner.invoke(main, ["disable", "sess-1"])
     assert result.exit_code == 0
     state = load_state()
-    assert "sess-1" not in state["enabled"]
-    assert "sess-2" in state["enabled"]
+    assert "sess-1" not in state["sessions"]
+    assert "sess-2" in state["sessions"]
     assert str(afk_home) in result.output
 
 
@@ -108,7 +110,7 @@ def test_disable_session_not_found(afk_home, sample_config):
         claude_homes=[str(afk_home)],
     )
     cfg.save()
-    save_state({"enabled": ["sess-ghost"]})
+    save_state({"mode": "explicit", "sessions": ["sess-ghost"]})
     runner = CliRunner()
     result = runner.invoke(main, ["disable", "sess-ghost"])
     assert result.exit_code == 1
@@ -131,6 +133,18 @@ def test_enable_session_not_found(afk_home, sample_config):
     assert "not found" in result.output
 
 
+def test_enable_session_not_found_skips_state(afk_home, sample_config, monkeypatch):
+    """Failing invocations exit before state.json/state.log are read."""
+    import claude_afk.cli as cli
+
+    sample_config.save()
+    monkeypatch.setattr(cli, "load_state", lambda: pytest.fail("state read"))
+    runner = CliRunner()
+    result = runner.invoke(main, ["enable", "nonexistent-sess"])
+    assert result.exit_code == 1
+    assert "not found" in result.output
+
+
 def test_enable_session_no_claude_homes(afk_home, sample_config):
     sample_config.save()  # sample_config has no claude_homes
     runner = CliRunner()
@@ -215,7 +229,7 @@ def test_status_configured(afk_home):
         claude_homes=["/home/user/.claude"],
     )
     cfg.save()
-    save_state({"enabled": "all"})
+    save_state({"mode": "all"})
 
     runner = CliRunner()
     result = runner.invoke(main, ["status"])
@@ -452,6 +466,71 @@ def test_install_hooks_corrupt_settings_json(tmp_path):
     assert "Stop" in settings["hooks"]
 
 
+def test_install_hooks_replaces_entries_from_old_prefix(tmp_path):
+    """Entries written by an install at a different path are still deduplicated."""
+    claude_home = tmp_path / "claude"
+    claude_home.mkdir()
+    stale = {
+        "matcher": "",
+        "hooks": [{"type": "command", "command": "/old/venv/bin/claude-afk hook stop"}],
+    }
+    settings_path = claude_home / "settings.json"
+    settings_path.write_text(json.dumps({"hooks": {"Stop": [stale]}}))
+
+    _install_hooks(str(claude_home))
+
+    with open(settings_path) as f:
+        stop_hooks = json.load(f)["hooks"]["Stop"]
+    assert stale not in stop_hooks
+    assert len(stop_hooks) == 1
+
+
+def test_install_hooks_keeps_user_hook_mentioning_name(tmp_path):
+    """Only ``claude-afk hook <name>`` commands count as ours."""
+    claude_home = tmp_path / "claude"
+    claude_home.mkdir()
+    user_entry = {
+        "matcher": "",
+        "hooks": [{"type": "command", "command": "notify-send claude-afk-done"}],
+    }
+    settings_path = claude_home / "settings.json"
+    settings_path.write_text(json.dumps({"hooks": {"Stop": [user_entry]}}))
+
+    _install_hooks(str(claude_home))
+    _uninstall_hooks(str(claude_home))
+
+    with open(settings_path) as f:
+        assert json.load(f)["hooks"]["Stop"] == [user_entry]
+
+
+def test_install_hooks_writes_compact_json(tmp_path):
+    _install_hooks(str(tmp_path))
+    raw = (tmp_path / "settings.json").read_bytes()
+    assert b"\n" not in raw
+    assert "Stop" in json.loads(raw)["hooks"]
+
+
+def test_install_hooks_does_not_alias_cached_entries(tmp_path, monkeypatch):
+    import claude_afk.cli as cli
+
+    written = {}
+    monkeypatch.setattr(
+        cli, "_write_settings", lambda path, settings, indent: written.update(settings)
+    )
+    _install_hooks(str(tmp_path))
+    cached = cli._build_hooks_to_install()
+    written["hooks"]["Stop"][0]["hooks"][0]["command"] = "mutated"
+    assert cached["Stop"][0]["hooks"][0]["command"] != "mutated"
+
+
+def test_install_hooks_keeps_pretty_settings_pretty(tmp_path):
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(json.dumps({"model": "opus"}, indent=2))
+    _install_hooks(str(tmp_path))
+    _uninstall_hooks(str(tmp_path))
+    assert settings_path.read_text() == json.dumps({"model": "opus", "hooks": {}}, indent=2) + "\n"
+
+
 def test_uninstall_hooks_no_file(tmp_path):
     result = _uninstall_hooks(str(tmp_path / "nonexistent"))
     assert result is False
@@ -545,3 +624,36 @@ def test_uninstall_no_homes_registered(afk_home):
     result = runner.invoke(main, ["uninstall"])
     assert result.exit_code == 0
     assert "nothing to uninstall" in result.output.lower()
+
+
+# --- hook fast-path dispatch ---
+
+
+def test_dispatch_hook_bypasses_click(monkeypatch):
+    import claude_afk.hooks.stop as stop_hook
+    from claude_afk.__main__ import _dispatch_hook
+
+    calls = []
+    monkeypatch.setattr(stop_hook, "main", lambda **kw: calls.append(kw))
+    assert _dispatch_hook(["hook", "stop"]) is True
+    assert calls == [{}]
+
+
+def test_dispatch_hook_notify_event(monkeypatch):
+    import claude_afk.hooks.notify as notify_hook
+    from claude_afk.__main__ import _dispatch_hook
+
+    calls = []
+    monkeypatch.setattr(notify_hook, "main", lambda **kw: calls.append(kw))
+    assert _dispatch_hook(["hook", "notify", "--event", "stop"]) is True
+    assert _dispatch_hook(["hook", "notify", "--event=notification"]) is True
+    assert calls == [{"event": "stop"}, {"event": "notification"}]
+
+
+def test_dispatch_hook_defers_to_click():
+    from claude_afk.__main__ import _dispatch_hook
+
+    assert _dispatch_hook(["status"]) is False
+    assert _dispatch_hook(["hook", "stop", "--help"]) is False
+    assert _dispatch_hook(["hook", "notify", "--event", "bogus"]) is False
+    assert _dispatch_hook(["hook", "unknown"]) is False
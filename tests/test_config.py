@@ -2,16 +2,22 @@
 
 from __future__ import annotations
 
+import json
 import os
 import stat
 
+import pytest
+
+from claude_afk import config
 from claude_afk.config import (
     SlackConfig,
+    append_state_op,
     is_session_enabled,
     load_state,
     save_state,
     session_exists,
     setup_logging,
+    write_file,
 )
 
 
@@ -33,6 +39,7 @@ def test_slack_config_roundtrip(afk_home):
         user_id="U999",
         dm_channel_id="D888",
         timeout=60,
+        poll_interval=4.0,
         claude_homes=["/home/user/.claude"],
     )
     original.save()
@@ -42,9 +49,19 @@ def test_slack_config_roundtrip(afk_home):
     assert loaded.user_id == "U999"
     assert loaded.dm_channel_id == "D888"
     assert loaded.timeout == 60
+    assert loaded.poll_interval == 4.0
     assert loaded.claude_homes == ["/home/user/.claude"]
 
 
+def test_slack_config_invalid_poll_interval_falls_back(afk_home):
+    default = config.DEFAULT_POLL_INTERVAL
+    for raw, expected in (("fast", default), (None, default), ([1], default), ("2.5", 2.5)):
+        data = {"slack_bot_token": "xoxb-x", "poll_interval": raw}
+        (afk_home / "config.json").write_text(json.dumps(data))
+        config._clear_caches()
+        assert SlackConfig.from_file().poll_interval == expected
+
+
 def test_slack_config_file_permissions(afk_home):
     cfg = SlackConfig(
         bot_token="xoxb-secret", socket_mode_token="x", user_id="U1", dm_channel_id="D1"
@@ -55,6 +72,73 @@ def test_slack_config_file_permissions(afk_home):
     assert mode == 0o600
 
 
+def test_slack_config_from_file_cached_until_changed(afk_home):
+    SlackConfig(bot_token="xoxb-1", timeout=60).save()
+    first = SlackConfig.from_file()
+    assert SlackConfig.from_file() is first
+
+    SlackConfig(bot_token="xoxb-2", timeout=60).save()
+    second = SlackConfig.from_file()
+    assert second is not first
+    assert second.bot_token == "xoxb-2"
+
+
+def test_slack_config_from_file_sees_external_write(afk_home):
+    SlackConfig(bot_token="xoxb-1").save()
+    assert SlackConfig.from_file().bot_token == "xoxb-1"
+
+    # Another process rewrites the file (different size → new signature)
+    (afk_home / "config.json").write_text('{"slack_bot_token": "xoxb-external"}')
+    assert SlackConfig.from_file().bot_token == "xoxb-external"
+
+
+def test_slack_config_save_tightens_existing_file_mode(afk_home):
+    path = afk_home / "config.json"
+    path.write_text("{}")
+    os.chmod(path, 0o644)
+    SlackConfig(bot_token="xoxb-secret").save()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_write_file_truncates(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_bytes(b"a much longer previous payload")
+    write_file(path, b"{}")
+    assert path.read_bytes() == b"{}"
+
+
+def test_write_file_is_atomic_rename(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_bytes(b"old")
+    os.chmod(path, 0o640)
+    inode = path.stat().st_ino
+    write_file(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert path.stat().st_ino != inode
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_write_file_follows_symlink(tmp_path):
+    real = tmp_path / "real.json"
+    real.write_bytes(b"old")
+    link = tmp_path / "link.json"
+    link.symlink_to(real)
+    write_file(link, b"new")
+    assert link.is_symlink()
+    assert real.read_bytes() == b"new"
+
+
+def test_atomic_writer_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError), config.atomic_writer(path) as f:
+        f.write(b"partial")
+        raise RuntimeError
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
 def test_slack_config_is_valid():
     valid = SlackConfig(
         bot_token="xoxb-x", socket_mode_token="xapp-x", user_id="U1", dm_channel_id="D1"
@@ -67,38 +151,173 @@ def test_slack_config_is_valid():
 
 def test_load_state_missing(afk_home):
     state = load_state()
-    assert state == {"enabled": []}
+    assert state == {"mode": "explicit", "sessions": [], "sessions_set": frozenset()}
+
+
+def test_load_state_sessions_set(afk_home):
+    save_state({"mode": "explicit", "sessions": ["b", "a"]})
+    state = load_state()
+    assert state["sessions_set"] == frozenset({"a", "b"})
+    assert state["sessions"] == ["a", "b"]
+
+
+def test_save_state_writes_tagged_layout(afk_home):
+    save_state({"mode": "explicit", "sessions": {"sess-2", "sess-1"}})
+    on_disk = json.loads((afk_home / "state.json").read_text())
+    assert on_disk == {"mode": "explicit", "sessions": ["sess-1", "sess-2"]}
+
+    save_state({"mode": "all", "sessions": ["ignored"]})
+    assert json.loads((afk_home / "state.json").read_text()) == {
+        "mode": "explicit",
+        "sessions": [],
+    }
+    assert (afk_home / "enabled_all").exists()
+
+
+def test_enabled_all_marker(afk_home):
+    append_state_op("enable", "sess-1")
+    append_state_op("enable", "all")
+    assert (afk_home / "enabled_all").exists()
+    assert load_state()["mode"] == "all"
+
+    append_state_op("disable", "all")
+    assert not (afk_home / "enabled_all").exists()
+    assert load_state()["mode"] == "explicit"
+
+
+def test_is_session_enabled_marker_skips_state(afk_home, monkeypatch):
+    (afk_home / "enabled_all").touch()
+    monkeypatch.setattr(config, "load_state", lambda: pytest.fail("state read"))
+    assert is_session_enabled("anything") is True
+
+
+def test_load_state_legacy_layout(afk_home):
+    (afk_home / "state.json").write_text('{"enabled": ["sess-1"]}')
+    state = load_state()
+    assert state["mode"] == "explicit"
+    assert state["sessions"] == ["sess-1"]
+
+    (afk_home / "state.json").write_text('{"enabled": "all"}')
+    assert load_state()["mode"] == "all"
 
 
 def test_state_roundtrip(afk_home):
-    save_state({"enabled": ["sess-1", "sess-2"]})
+    save_state({"mode": "explicit", "sessions": ["sess-1", "sess-2"]})
+    state = load_state()
+    assert state["sessions"] == ["sess-1", "sess-2"]
+
+
+def test_load_state_returns_independent_copies(afk_home):
+    save_state({"mode": "explicit", "sessions": ["sess-1"]})
     state = load_state()
-    assert state["enabled"] == ["sess-1", "sess-2"]
+    state["sessions"].append("sess-2")
+    assert load_state()["sessions"] == ["sess-1"]
+
+
+def test_append_state_op_replayed_on_load(afk_home):
+    save_state({"mode": "explicit", "sessions": ["sess-1"]})
+    append_state_op("enable", "sess-2")
+    append_state_op("disable", "sess-1")
+    assert load_state()["sessions"] == ["sess-2"]
+    # Snapshot untouched until compaction
+    assert "sess-2" not in (afk_home / "state.json").read_text()
+
+
+def test_append_state_op_all(afk_home):
+    append_state_op("enable", "sess-1")
+    append_state_op("enable", "all")
+    assert load_state()["mode"] == "all"
+    append_state_op("disable", "all")
+    state = load_state()
+    assert state["mode"] == "explicit"
+    assert state["sessions"] == []
+
+
+def test_state_log_ignores_partial_line(afk_home):
+    append_state_op("enable", "sess-1")
+    with open(afk_home / "state.log", "ab") as f:
+        f.write(b'{"op": "enable", "tar')
+    assert load_state()["sessions"] == ["sess-1"]
+
+
+def test_state_log_compacts(afk_home, monkeypatch):
+    monkeypatch.setattr(config, "STATE_LOG_COMPACT_BYTES", 200)
+    for i in range(10):
+        append_state_op("enable", f"sess-{i}")
+    assert (afk_home / "state.log").stat().st_size <= 200
+    assert load_state()["sessions"] == [f"sess-{i}" for i in range(10)]
+
+
+def test_save_state_clears_log(afk_home):
+    append_state_op("enable", "sess-1")
+    save_state({"mode": "explicit", "sessions": []})
+    assert (afk_home / "state.log").stat().st_size == 0
+    assert load_state()["sessions"] == []
 
 
 def test_is_session_enabled_list(afk_home):
-    save_state({"enabled": ["abc", "def"]})
+    save_state({"mode": "explicit", "sessions": ["abc", "def"]})
     assert is_session_enabled("abc") is True
     assert is_session_enabled("def") is True
 
 
 def test_is_session_enabled_all(afk_home):
-    save_state({"enabled": "all"})
+    save_state({"mode": "all"})
     assert is_session_enabled("anything") is True
 
 
 def test_is_session_enabled_not_in_list(afk_home):
-    save_state({"enabled": ["abc"]})
+    save_state({"mode": "explicit", "sessions": ["abc"]})
     assert is_session_enabled("xyz") is False
 
 
 def test_setup_logging(afk_home):
-    setup_logging()
     import logging
 
     logger = logging.getLogger("claude-afk")
-    assert len(logger.handlers) > 0
-    assert (afk_home / "logs" / "claude-afk.log").exists()
+    saved = logger.handlers[:]
+    logger.handlers.clear()
+    try:
+        setup_logging()
+        assert len(logger.handlers) > 0
+        assert (afk_home / "logs" / "claude-afk.log").exists()
+    finally:
+        for h in logger.handlers:
+            h.close()
+        logger.handlers[:] = saved
+
+
+def test_setup_logging_idempotent(afk_home, monkeypatch):
+    import logging
+
+    logger = logging.getLogger("claude-afk")
+    saved = logger.handlers[:]
+    logger.handlers.clear()
+    try:
+        setup_logging()
+        monkeypatch.setattr(logging, "FileHandler", None)  # second call must not reopen
+        setup_logging()
+        assert len(logger.handlers) == 1
+    finally:
+        for h in logger.handlers:
+            h.close()
+        logger.handlers[:] = saved
+
+
+def test_setup_logging_leaves_foreign_handler_alone(afk_home, monkeypatch):
+    import logging
+
+    logger = logging.getLogger("claude-afk")
+    saved = logger.handlers[:]
+    foreign = logging.NullHandler()
+    logger.handlers[:] = [foreign]
+    try:
+        monkeypatch.setattr(logging, "FileHandler", None)  # must not open the log file
+        setup_logging()
+        assert logger.handlers == [foreign]
+        assert not (afk_home / "logs" / "claude-afk.log").exists()
+    finally:
+        logger.handlers[:] = saved
 
 
 # --- session_exists ---
@@ -136,3 +355,13 @@ def test_session_exists_multiple_homes(tmp_path):
     session_dir.mkdir(parents=True)
     (session_dir / "sess-xyz.jsonl").touch()
     assert session_exists("sess-xyz", [str(home1), str(home2)]) is True
+
+
+def test_session_exists_sees_new_session(tmp_path):
+    home = tmp_path / "home1"
+    session_dir = home / "projects" / "myproject"
+    session_dir.mkdir(parents=True)
+    assert session_exists("sess-new", [str(home)]) is False
+    (session_dir / "sess-new.jsonl").touch()
+    os.utime(session_dir, ns=(0, session_dir.stat().st_mtime_ns + 1_000_000))
+    assert session_exists("sess-new", [str(home)]) is True
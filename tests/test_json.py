@@ -0,0 +1,48 @@
+"""Tests for _json — orjson wrapper with stdlib fallback."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from claude_afk import _json
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(_json, "orjson", None)
+    elif _json.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_roundtrip(backend):
+    data = {"enabled": ["a", "b"], "timeout": 30, "name": "café"}
+    assert _json.loads(_json.dumps(data)) == data
+
+
+def test_dumps_indent_matches_stdlib(backend):
+    data = {"hooks": {"Stop": [{"matcher": "", "hooks": []}]}, "n": 1}
+    expected = json.dumps(data, indent=2) + "\n"
+    assert _json.dumps(data, indent=True).decode() == expected
+
+
+def test_dumps_returns_bytes(backend):
+    assert isinstance(_json.dumps({"a": 1}), bytes)
+
+
+def test_loads_invalid_raises_json_decode_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        _json.loads(b"not json {{{")
+
+
+def test_dump_streams_same_bytes_as_dumps(backend):
+    import io
+
+    data = {"hooks": {"Stop": [{"matcher": "", "hooks": [{"command": "x"}]}]}}
+    for indent in (False, True):
+        buf = io.BytesIO()
+        _json.dump(data, buf, indent=indent)
+        assert buf.getvalue() == _json.dumps(data, indent=indent)
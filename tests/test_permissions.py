@@ -8,6 +8,7 @@ from claude_afk.permissions import (
     TOOL_POLICIES,
     Decision,
     ToolPolicy,
+    approved_bash_prefixes,
     build_session_rule,
     check_bash_prefixes,
     check_session_permission,
@@ -42,6 +43,31 @@ def test_tool_has_cc_rule_file_glob():
     assert tool_has_cc_rule("Read", {"file_path": "/etc/passwd"}, rules) is False
 
 
+def test_tool_has_cc_rule_precomputed_value():
+    rules = ["Bash(npm run *)"]
+    assert tool_has_cc_rule("Bash", {}, rules, value="npm run test") is True
+    assert tool_has_cc_rule("Bash", {"command": "npm run test"}, rules, value="ls") is False
+
+
+def test_tool_has_cc_rule_glob_is_anchored():
+    rules = ["Bash(git status)"]
+    assert tool_has_cc_rule("Bash", {"command": "git status"}, rules) is True
+    assert tool_has_cc_rule("Bash", {"command": "git status && rm -rf /"}, rules) is False
+
+
+def test_index_rules_groups_by_tool():
+    from claude_afk.permissions import index_rules
+
+    bare, patterned = index_rules(["Read", "Bash(ls *)", "Bash(git *)", "Write(/tmp/*)"])
+    assert bare == {"Read"}
+    assert sorted(patterned) == ["Bash", "Write"]
+    assert len(patterned["Bash"]) == 2
+
+
+def test_tool_has_cc_rule_specifier_on_fieldless_tool():
+    assert tool_has_cc_rule("Task", {"prompt": "x"}, ["Task(*)"]) is False
+
+
 # --- load_cc_permission_rules ---
 
 
@@ -76,6 +102,74 @@ def test_load_cc_permission_rules_missing_files(tmp_path, monkeypatch):
     assert rules == []
 
 
+def test_load_cc_permission_rules_opt_out(tmp_path, monkeypatch):
+    config_dir = tmp_path / "claude-config"
+    config_dir.mkdir()
+    (config_dir / "settings.json").write_text(json.dumps({"permissions": {"allow": ["Read"]}}))
+    monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(config_dir))
+    monkeypatch.setenv("CLAUDE_AFK_NO_CC_RULES", "1")
+
+    assert load_cc_permission_rules(str(tmp_path)) == []
+
+
+def test_load_cc_permission_rules_uses_cache(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    config_dir = tmp_path / "claude-config"
+    config_dir.mkdir()
+    settings_path = config_dir / "settings.json"
+    settings_path.write_text(json.dumps({"permissions": {"allow": ["Read"]}}))
+    monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(config_dir))
+
+    assert load_cc_permission_rules("") == ["Read"]
+    perms._rules_memo.clear()  # as in a fresh hook process
+    monkeypatch.setattr(perms, "_load_json_permissions", lambda path: ["stale"])
+    assert load_cc_permission_rules("") == ["Read"]
+
+    # Rewriting the settings file changes its stat signature
+    settings_path.write_text(json.dumps({"permissions": {"allow": ["Read", "Edit"]}}))
+    assert load_cc_permission_rules("") == ["stale"]
+
+
+def test_load_cc_permission_rules_memoized_in_process(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    config_dir = tmp_path / "claude-config"
+    config_dir.mkdir()
+    (config_dir / "settings.json").write_text(json.dumps({"permissions": {"deny": ["Bash"]}}))
+    monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(config_dir))
+
+    assert load_cc_permission_rules("") == ["Bash"]
+
+    def fail():
+        raise AssertionError("disk cache read")
+
+    monkeypatch.setattr(perms, "_read_rules_cache", fail)
+    assert load_cc_permission_rules("") == ["Bash"]
+
+
+def test_load_json_permissions_non_object(tmp_path):
+    from claude_afk.permissions import _load_json_permissions
+
+    path = tmp_path / "settings.json"
+    path.write_text("[1, 2]")
+    assert _load_json_permissions(str(path)) == []
+    path.write_text('{"permissions": "nope"}')
+    assert _load_json_permissions(str(path)) == []
+
+
+def test_tool_has_cc_rule_ignores_malformed_entries(tmp_path, monkeypatch):
+    config_dir = tmp_path / "claude"
+    config_dir.mkdir()
+    allow = ["Bash(git *)", {"tool": "Bash"}, ["Read"], 42]
+    (config_dir / "settings.json").write_text(json.dumps({"permissions": {"allow": allow}}))
+    monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(config_dir))
+
+    rules = load_cc_permission_rules("")
+    assert tool_has_cc_rule("Bash", {"command": "git status"}, rules)
+    assert not tool_has_cc_rule("Read", {"file_path": "/x"}, rules)
+
+
 # --- tool policies ---
 
 
@@ -96,6 +190,14 @@ def test_tool_policies_bash_always_ask():
     assert TOOL_POLICIES["Bash"] == ToolPolicy.ALWAYS_ASK
 
 
+def test_session_cacheable_tools_match_policies():
+    from claude_afk.permissions import _SESSION_CACHEABLE_TOOLS
+
+    ask_once = {t for t, p in TOOL_POLICIES.items() if p is ToolPolicy.ASK_ONCE}
+    cacheable = _SESSION_CACHEABLE_TOOLS
+    assert cacheable == ask_once | {"Read"}
+
+
 # --- get_tool_input_value ---
 
 
@@ -144,6 +246,25 @@ def test_sensitive_path_empty():
     assert is_sensitive_path("") is False
 
 
+def test_split_sensitive_patterns():
+    from claude_afk.permissions import _split_sensitive_patterns
+
+    exact, prefixes, suffixes, fallback = _split_sensitive_patterns(
+        [".env", ".env.*", "*.pem", "id_[rd]sa*", "a*b"]
+    )
+    assert exact == {".env"}
+    assert prefixes == (".env.",)
+    assert suffixes == (".pem",)
+    assert fallback.match("id_dsa.pub") and fallback.match("axxb")
+    assert not fallback.match("id_xsa")
+
+
+def test_sensitive_path_no_partial_match():
+    # Each pattern is anchored: ".env" must not match ".envrc".
+    assert is_sensitive_path("/path/.envrc") is False
+    assert is_sensitive_path("/path/server.pem.bak") is False
+
+
 # --- build_session_rule ---
 
 
@@ -210,6 +331,21 @@ def test_check_session_permission_deny(tmp_path, monkeypatch):
     assert result == Decision.DENY
 
 
+def test_check_session_permission_reuses_index(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+    save_session_permission("sess-1", "Edit(/tmp/main.py)", Decision.ALLOW)
+    assert check_session_permission("sess-1", "Edit", {"file_path": "/tmp/main.py"})
+
+    def fail(rules):
+        raise AssertionError("session rules re-indexed")
+
+    monkeypatch.setattr(perms, "index_rules", fail)
+    result = check_session_permission("sess-1", "Edit", {"file_path": "/tmp/main.py"})
+    assert result == Decision.ALLOW
+
+
 def test_check_session_permission_not_cached(tmp_path, monkeypatch):
     import claude_afk.permissions as perms
 
@@ -227,11 +363,76 @@ def test_save_session_permission_no_duplicates(tmp_path, monkeypatch):
     save_session_permission("sess-1", "Edit(/tmp/foo.py)", Decision.ALLOW)
     save_session_permission("sess-1", "Edit(/tmp/foo.py)", Decision.ALLOW)
 
-    path = tmp_path / "sessions" / "sess-1" / "permissions.json"
-    data = json.loads(path.read_text())
+    data = perms._read_session_cache("sess-1")
     assert data["permissions"]["allow"].count("Edit(/tmp/foo.py)") == 1
 
 
+def test_session_cache_saves_append_to_log(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+
+    save_session_permission("sess-1", "Edit(/tmp/foo.py)", Decision.ALLOW)
+    save_bash_prefixes("sess-1", ["git status"])
+
+    session_dir = tmp_path / "sessions" / "sess-1"
+    assert not (session_dir / "permissions.json").exists()
+    lines = (session_dir / "permissions.log").read_bytes().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"decision": "allow", "rule": "Edit(/tmp/foo.py)"},
+        {"bash_prefixes": ["git status"]},
+    ]
+
+
+def test_session_log_compacts_into_snapshot(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+    monkeypatch.setattr(perms, "SESSION_LOG_COMPACT_BYTES", 0)
+
+    save_session_permission("sess-1", "Edit(/tmp/foo.py)", Decision.ALLOW)
+    save_bash_prefixes("sess-1", ["git status"])
+
+    session_dir = tmp_path / "sessions" / "sess-1"
+    assert (session_dir / "permissions.log").read_bytes() == b""
+    raw = (session_dir / "permissions.json").read_bytes()
+    assert b"\n" not in raw
+    assert json.loads(raw) == {
+        "permissions": {"allow": ["Edit(/tmp/foo.py)"], "deny": []},
+        "bash_prefixes": ["git status"],
+    }
+
+
+def test_legacy_session_snapshot_is_merged_with_log(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+    path = tmp_path / "sessions" / "sess-1" / "permissions.json"
+    path.parent.mkdir(parents=True)
+    legacy = {"permissions": {"allow": ["Edit(/tmp/a.py)"], "deny": []}, "bash_prefixes": ["ls"]}
+    path.write_text(json.dumps(legacy, indent=2))
+
+    save_session_permission("sess-1", "Edit(/tmp/b.py)", Decision.ALLOW)
+
+    assert check_session_permission("sess-1", "Edit", {"file_path": "/tmp/a.py"}) is Decision.ALLOW
+    assert check_session_permission("sess-1", "Edit", {"file_path": "/tmp/b.py"}) is Decision.ALLOW
+    assert check_bash_prefixes("sess-1", "ls -la")[0] is True
+
+
+def test_corrupt_session_cache_is_ignored(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+    path = tmp_path / "sessions" / "sess-1" / "permissions.json"
+    path.parent.mkdir(parents=True)
+    path.write_text("{not json")
+
+    tool_input = {"file_path": "/tmp/foo.py"}
+    assert check_session_permission("sess-1", "Edit", tool_input) is None
+    save_session_permission("sess-1", "Edit(/tmp/foo.py)", Decision.ALLOW)
+    assert check_session_permission("sess-1", "Edit", tool_input) is Decision.ALLOW
+
+
 def test_deny_takes_precedence_over_allow(tmp_path, monkeypatch):
     """Deny for a file beats allow for the same file."""
     import claude_afk.permissions as perms
@@ -294,8 +495,7 @@ def test_save_bash_prefixes_no_duplicates(tmp_path, monkeypatch):
     save_bash_prefixes("sess-bp", ["git log", "grep"])
     save_bash_prefixes("sess-bp", ["git log", "head"])
 
-    path = tmp_path / "sessions" / "sess-bp" / "permissions.json"
-    data = json.loads(path.read_text())
+    data = perms._read_session_cache("sess-bp")
     assert data["bash_prefixes"].count("git log") == 1
     assert "grep" in data["bash_prefixes"]
     assert "head" in data["bash_prefixes"]
@@ -310,3 +510,16 @@ def test_check_bash_prefixes_empty_command(tmp_path, monkeypatch):
     assert all_ok is True
     assert approved == []
     assert unapproved == []
+
+
+def test_approved_bash_prefixes(tmp_path, monkeypatch):
+    import claude_afk.permissions as perms
+
+    monkeypatch.setattr(perms, "AFK_HOME", tmp_path)
+
+    assert approved_bash_prefixes("sess-bp", "git log") is None
+    save_bash_prefixes("sess-bp", ["git log", "grep"])
+
+    assert approved_bash_prefixes("sess-bp", "git log | grep x | git log -1") == ["git log", "grep"]
+    assert approved_bash_prefixes("sess-bp", "git log | head") is None
+    assert approved_bash_prefixes("sess-bp", "") is None
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
-from claude_afk.shell import extract_command_prefixes, split_shell_commands
+from claude_afk.shell import (
+    extract_command_prefixes,
+    iter_command_prefixes,
+    iter_shell_commands,
+    split_shell_commands,
+)
 
 # --- split_shell_commands ---
 
@@ -77,6 +82,16 @@ def test_split_no_delimiters():
     assert split_shell_commands("echo hello world") == ["echo hello world"]
 
 
+def test_split_unterminated_quote_runs_to_end():
+    assert split_shell_commands("echo 'a | b") == ["echo 'a | b"]
+    assert split_shell_commands('ls; echo "a | b') == ["ls", ' echo "a | b']
+
+
+def test_split_backslash_is_literal_inside_parens():
+    # Inside $( ), a backslash does not escape the closing paren.
+    assert split_shell_commands(r"echo $(a \) | wc") == [r"echo $(a \) ", " wc"]
+
+
 # --- extract_command_prefixes ---
 
 
@@ -247,3 +262,23 @@ def test_extract_prefixes_real_world_grep_pattern():
     )
     result = extract_command_prefixes(cmd)
     assert result == ["grep", "tail"]
+
+
+def test_iter_command_prefixes_is_lazy():
+    it = iter_command_prefixes("git log | head | git log -1")
+    assert next(it) == "git log"
+    assert list(it) == ["head", "git log"]
+
+
+def test_iter_shell_commands_skips_blank_parts():
+    assert list(iter_shell_commands("ls ;; pwd")) == ["ls ", " pwd"]
+
+
+def test_is_env_assignment_matches_regex():
+    import re
+
+    from claude_afk.shell import _is_env_assignment
+
+    env_re = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=\S*$")
+    for word in ["A=1", "_x=", "a9=b=c", "9a=1", "=1", "A", "é=1", "A-B=1", "PATH=$PATH:/x"]:
+        assert _is_env_assignment(word) == bool(env_re.match(word)), word
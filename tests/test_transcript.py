@@ -4,7 +4,13 @@ from __future__ import annotations
 
 import json
 
-from claude_afk.transcript import get_last_assistant_message, get_session_name
+import claude_afk.transcript as transcript
+from claude_afk.transcript import (
+    StopContext,
+    get_last_assistant_message,
+    get_session_name,
+    get_stop_context,
+)
 
 # --- get_session_name ---
 
@@ -82,3 +88,90 @@ def test_get_last_assistant_message_multiple(tmp_path):
     ]
     f.write_text("\n".join(lines) + "\n")
     assert get_last_assistant_message(str(f)) == "Second"
+
+
+def test_get_last_assistant_message_across_blocks(tmp_path, monkeypatch):
+    # Lines longer than the read block still parse when scanned from the end.
+    monkeypatch.setattr(transcript, "_TAIL_BLOCK", 16)
+    f = tmp_path / "transcript.jsonl"
+    text = "y" * 100
+    lines = [
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}}),
+        json.dumps({"type": "user", "message": {"content": "ok"}}),
+        "",
+    ]
+    f.write_text("\n".join(lines))
+    assert get_last_assistant_message(str(f)) == text
+
+
+def test_iter_lines_reversed_matches_forward_split(monkeypatch):
+    import io
+
+    monkeypatch.setattr(transcript, "_TAIL_BLOCK", 16)
+    long_line = b"z" * (transcript._TAIL_BLOCK * 7 + 3)
+    for data in (
+        b"",
+        b"a",
+        b"a\n",
+        b"\n\n",
+        b"short\n" + long_line + b"\nend",
+        long_line,
+        long_line + b"\n" + long_line + b"\n",
+        b"x" * 16 + b"\n" + b"y" * 32,
+    ):
+        got = list(transcript._iter_lines_reversed(io.BytesIO(data)))
+        assert got == list(reversed(data.split(b"\n")))
+
+
+def test_get_last_assistant_message_walks_past_long_line(tmp_path, monkeypatch):
+    # A text-less final assistant entry forces the scan back past a huge tool result.
+    monkeypatch.setattr(transcript, "_TAIL_BLOCK", 64)
+    f = tmp_path / "transcript.jsonl"
+    lines = [
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "A"}]}}),
+        json.dumps({"type": "user", "message": {"content": "x" * (64 * 20)}}),
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "tool_use"}]}}),
+    ]
+    f.write_text("\n".join(lines) + "\n")
+    assert get_last_assistant_message(str(f)) == "A"
+
+
+# --- get_stop_context ---
+
+
+def test_get_stop_context(tmp_path):
+    f = tmp_path / "transcript.jsonl"
+    lines = [
+        json.dumps({"type": "user", "message": {"content": "Fix the bug"}}),
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "A"}]}}),
+        "[1, 2]",
+        json.dumps({"type": "user", "message": {"content": "more"}}),
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "B"}]}}),
+    ]
+    f.write_text("\n".join(lines) + "\n")
+    assert get_stop_context(str(f)) == StopContext("B", "Fix the bug")
+
+
+def test_get_stop_context_missing_file():
+    assert get_stop_context("/nonexistent/path.jsonl") == StopContext()
+    assert get_stop_context("") == StopContext()
+
+
+def test_get_stop_context_skips_unrelated_lines_without_decoding(tmp_path, monkeypatch):
+    f = tmp_path / "transcript.jsonl"
+    tool = json.dumps({"type": "tool_result", "content": "x" * 100})
+    lines = [
+        json.dumps({"type": "user", "message": {"content": "Fix the bug"}}),
+        *[tool] * 50,
+        json.dumps({"type": "assistant", "message": {"content": [{"type": "text", "text": "B"}]}}),
+        *[tool] * 50,
+    ]
+    f.write_text("\n".join(lines) + "\n")
+
+    parsed = []
+    real_parse = transcript._parse_line
+    monkeypatch.setattr(
+        transcript, "_parse_line", lambda line: parsed.append(line) or real_parse(line)
+    )
+    assert get_stop_context(str(f)) == StopContext("B", "Fix the bug")
+    assert len(parsed) == 2